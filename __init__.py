@@ -2,38 +2,44 @@
 Trading bot widgets for ShellAgent.
 """
 
+import importlib
+
 # Initialize widget variables with None
 PineScriptExecutor = None
 ConfigurationManager = None
 BacktestReportGenerator = None
 StrategyLibrary = None
 
+# Widget class name -> submodule that defines it
+_WIDGET_MODULES = {
+    "PineScriptExecutor": ".pine_script_executor",
+    "ConfigurationManager": ".configuration_manager",
+    "BacktestReportGenerator": ".backtest_report_generator",
+    "StrategyLibrary": ".strategy_library",
+}
+
+_loaded = False
+
 # Define a function to load widgets with lazy loading
 def _load_widgets():
     """
     Lazy load the widget implementations to avoid import errors during ShellAgent startup.
+    Subsequent calls are no-ops once the widgets have been loaded.
     """
-    global PineScriptExecutor, ConfigurationManager, BacktestReportGenerator, StrategyLibrary
-    
-    try:
-        from .pine_script_executor import PineScriptExecutor
-    except ImportError:
-        pass
-    
-    try:
-        from .configuration_manager import ConfigurationManager
-    except ImportError:
-        pass
-    
-    try:
-        from .backtest_report_generator import BacktestReportGenerator
-    except ImportError:
-        pass
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
     
-    try:
-        from .strategy_library import StrategyLibrary
-    except ImportError:
-        pass
+    for widget_name, module_name in _WIDGET_MODULES.items():
+        try:
+            module = importlib.import_module(module_name, __name__)
+        except ImportError as e:
+            # Only a missing widget module is skipped; a broken import inside one must surface
+            if e.name != __name__ + module_name:
+                raise
+            continue
+        globals()[widget_name] = getattr(module, widget_name)
 
 # Load widgets when the module is imported
 _load_widgets()
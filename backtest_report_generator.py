@@ -1,13 +1,28 @@
-import os
+import io
+import csv
 import json
-import tempfile
+import base64
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any
 from pydantic import Field
-import base64
-import shutil
 import pathlib
 
+try:
+    import orjson  # optional fast JSON encoder
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np  # optional, used to vectorize per-point chart styling
+except ImportError:
+    np = None
+
+try:
+    import pyarrow as pa  # optional, only needed for the parquet report format
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
 # Import central path constant for static build directory
 from servers.base import WEB_BUILD_DIR
 
@@ -35,6 +50,181 @@ def Input(*args, **kwargs):
 def Output(*args, **kwargs):
     return Input(*args, **kwargs)
 
+
+def _dumps(obj, indent=False):
+    """Serialize obj to a JSON string, preferring orjson when it is installed."""
+    if orjson is not None:
+        # OPT_NON_STR_KEYS stringifies int keys (e.g. month numbers) as json.dumps does
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option).decode()
+    return json.dumps(obj, indent=2 if indent else None)
+
+
+def _loads(data):
+    """Parse a JSON document, preferring orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _bar_colors(values):
+    """Green for non-negative returns, red for negative ones."""
+    if np is not None and len(values):
+        return np.where(np.asarray(values) >= 0, 'rgb(44, 160, 44)', 'rgb(214, 39, 40)').tolist()
+    return ['rgb(44, 160, 44)' if y >= 0 else 'rgb(214, 39, 40)' for y in values]
+
+
+def _trade_records(trades):
+    """Accept trades as a list of records or in the executor's "columns" layout (one list per field)."""
+    if isinstance(trades, dict):
+        return [dict(zip(trades, values)) for values in zip(*trades.values())]
+    return trades
+
+
+# Below this many trades the NumPy round trip costs more than it saves
+_VECTORIZE_MIN_TRADES = 256
+
+
+def _profit_classes(trades):
+    """CSS class ("profit"/"loss") for each trade based on its profit_percent."""
+    if np is not None and len(trades) >= _VECTORIZE_MIN_TRADES:
+        pp = np.fromiter((t.get('profit_percent', 0) for t in trades), dtype=np.float64, count=len(trades))
+        return np.where(pp >= 0, "profit", "loss").tolist()
+    return ["profit" if t.get('profit_percent', 0) >= 0 else "loss" for t in trades]
+
+
+# Static report skeleton, built once at import time instead of on every report.
+# Literal CSS braces are doubled because these are str.format templates.
+_HTML_HEAD = """
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>Backtest Report: {name}</title>
+            <style>
+                body {{
+                    font-family: Arial, sans-serif;
+                    line-height: 1.6;
+                    margin: 20px;
+                    color: #333;
+                }}
+                h1, h2, h3 {{
+                    color: #2c3e50;
+                }}
+                .summary-box {{
+                    background-color: #f8f9fa;
+                    border: 1px solid #dee2e6;
+                    border-radius: 5px;
+                    padding: 15px;
+                    margin-bottom: 20px;
+                }}
+                table {{
+                    border-collapse: collapse;
+                    width: 100%;
+                    margin-bottom: 20px;
+                }}
+                th, td {{
+                    border: 1px solid #dee2e6;
+                    padding: 8px 12px;
+                    text-align: left;
+                }}
+                th {{
+                    background-color: #e9ecef;
+                }}
+                tr:nth-child(even) {{
+                    background-color: #f2f2f2;
+                }}
+                .chart-container {{
+                    margin-bottom: 30px;
+                }}
+                .profit {{
+                    color: green;
+                }}
+                .loss {{
+                    color: red;
+                }}
+            </style>
+            <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+        </head>
+        <body>
+            <h1>Backtest Report: {name}</h1>
+"""
+
+# (label, backtest_results key, unit suffix) for each row of the summary table
+_SUMMARY_ROWS = (
+    ("Net Profit", "net_profit_percent", "%"),
+    ("Total Trades", "total_trades", ""),
+    ("Win Rate", "win_rate", "%"),
+    ("Profit Factor", "profit_factor", ""),
+    ("Max Drawdown", "max_drawdown_percent", "%"),
+    ("Sharpe Ratio", "sharpe_ratio", ""),
+)
+
+_SUMMARY_TEMPLATE = """            <div class="summary-box">
+                <h2>Performance Summary</h2>
+                <table>
+                    <tr>
+                        <th>Metric</th>
+                        <th>Value</th>
+                    </tr>{rows}
+                </table>
+            </div>
+        """
+
+_SUMMARY_ROW_TEMPLATE = """
+                    <tr>
+                        <td>{label}</td>
+                        <td>{value}{suffix}</td>
+                    </tr>"""
+
+_TRADE_ROW_TEMPLATE = """
+                <tr>
+                    <td>{id}</td>
+                    <td>{entry_date}</td>
+                    <td>{exit_date}</td>
+                    <td>{side}</td>
+                    <td>{entry_price}</td>
+                    <td>{exit_price}</td>
+                    <td class="{cls}">{profit_amount}</td>
+                    <td class="{cls}">{profit_percent}%</td>
+                </tr>
+                """
+
+_EQUITY_LAYOUT = {"title": "Equity Curve", "xaxis": {"title": "Time"}, "yaxis": {"title": "Equity (%)"}}
+_DRAWDOWN_LAYOUT = {"title": "Drawdown Chart", "xaxis": {"title": "Time"}, "yaxis": {"title": "Drawdown (%)"}}
+_MONTHLY_LAYOUT = {"title": "Monthly Returns", "xaxis": {"title": "Month"}, "yaxis": {"title": "Return (%)"}}
+
+_CHARTS_SECTION = """
+            <h2>Performance Charts</h2>
+            <div class="chart-container">
+                <div id="equity-chart" style="width: 100%; height: 400px;"></div>
+            </div>
+            <div class="chart-container">
+                <div id="drawdown-chart" style="width: 100%; height: 300px;"></div>
+            </div>
+            <div class="chart-container">
+                <div id="monthly-returns-chart" style="width: 100%; height: 300px;"></div>
+            </div>
+            """
+
+_CHART_DATA_TEMPLATE = """
+            <script type="application/json" id="plotly-data">{payload}</script>
+            """
+
+# Plots whichever charts are present in the #plotly-data payload
+_CHART_BOOTSTRAP = """
+            <script>
+                var chartData = JSON.parse(document.getElementById('plotly-data').textContent);
+                var chartTargets = {
+                    equity: 'equity-chart',
+                    drawdown: 'drawdown-chart',
+                    monthly: 'monthly-returns-chart'
+                };
+                Object.keys(chartData).forEach(function (key) {
+                    Plotly.newPlot(chartTargets[key], [chartData[key].trace], chartData[key].layout);
+                });
+            </script>
+            """
+
 # ------------------------------------------------------------------------------
 
 @WIDGETS.register_module()
@@ -46,9 +236,10 @@ class BacktestReportGenerator(BaseWidget):
         backtest_results: Dict[str, Any] = Input({}, description="Backtest results to include in the report (object mode)", type="object")
         backtest_results_json: Dict[str, Any] = Input({}, description="Backtest results as JSON string or object (legacy)", type="object")
         strategy_name: str = Input("", description="Name of the strategy", type="string")
-        format: str = Input("html", description="Output format (html, json, csv)", type="string")
+        format: str = Input("html", description="Output format (html, json, csv, parquet)", type="string")
         include_charts: bool = Input(True, description="Whether to include charts in the report", type="boolean")
         include_trades: bool = Input(True, description="Whether to include individual trades in the report", type="boolean")
+        include_report_data: bool = Input(True, description="Whether to return the HTML report content in report_data (disable for large reports served via download_url)", type="boolean")
         
     class OutputsSchema(BaseWidget.OutputsSchema):
         status: str = Output("", description="Execution status", type="string")
@@ -65,15 +256,18 @@ class BacktestReportGenerator(BaseWidget):
                 backtest_results = config.backtest_results
             elif config.backtest_results_json:
                 if isinstance(config.backtest_results_json, str):
-                    backtest_results = json.loads(config.backtest_results_json)
+                    backtest_results = _loads(config.backtest_results_json)
                 else:
                     backtest_results = config.backtest_results_json  # already a dict
             else:
                 backtest_results = {}
+            if isinstance(backtest_results.get('trades'), dict):
+                backtest_results = dict(backtest_results, trades=_trade_records(backtest_results['trades']))
             strategy_name = config.strategy_name
             report_format = config.format.lower()
             include_charts = config.include_charts
             include_trades = config.include_trades
+            now = datetime.now()  # single timestamp shared by file name and report body
             
             # Validate input
             if not backtest_results:
@@ -85,17 +279,7 @@ class BacktestReportGenerator(BaseWidget):
                     "download_url": ""
                 }
                 
-            # Create report based on format
-            if report_format == "html":
-                report_path, report_data = self._generate_html_report(
-                    backtest_results, strategy_name, include_charts, include_trades)
-            elif report_format == "json":
-                report_path, report_data = self._generate_json_report(
-                    backtest_results, strategy_name, include_charts, include_trades)
-            elif report_format == "csv":
-                report_path, report_data = self._generate_csv_report(
-                    backtest_results, strategy_name, include_trades)
-            else:
+            if report_format not in ("html", "json", "csv", "parquet"):
                 return {
                     "status": "error",
                     "message": f"Unsupported format: {report_format}",
@@ -103,21 +287,39 @@ class BacktestReportGenerator(BaseWidget):
                     "report_data": "",
                     "download_url": ""
                 }
+            if report_format == "parquet" and pa is None:
+                return {
+                    "status": "error",
+                    "message": "Parquet reports require the pyarrow package",
+                    "report_path": "",
+                    "report_data": "",
+                    "download_url": ""
+                }
                 
-            # Ensure the generated report resides inside WEB_BUILD_DIR/reports.
+            # Resolve the output location once; reports are written straight into the
+            # static WEB_BUILD_DIR/reports directory, so no extra copy is needed afterwards.
             reports_dir = pathlib.Path(WEB_BUILD_DIR) / "reports"
             reports_dir.mkdir(parents=True, exist_ok=True)
+            safe_name = "".join(c if c.isalnum() else "_" for c in strategy_name)
+            report_filename = f"{safe_name}_{now.strftime('%Y%m%d%H%M%S')}.{report_format}"
+            report_path = str(reports_dir / report_filename)
+                
+            # Create report based on format
+            if report_format == "html":
+                report_data = self._generate_html_report(
+                    report_path, backtest_results, strategy_name, include_charts, include_trades,
+                    return_body=config.include_report_data)
+            elif report_format == "json":
+                report_data = self._generate_json_report(
+                    report_path, backtest_results, strategy_name, include_charts, include_trades, now)
+            elif report_format == "csv":
+                report_data = self._generate_csv_report(
+                    report_path, backtest_results, strategy_name, include_trades, now)
+            else:
+                report_data = self._generate_parquet_report(
+                    report_path, backtest_results, strategy_name, include_trades, now)
 
-            # If the generator already saved inside reports_dir we are good; otherwise copy it.
-            if not str(report_path).startswith(str(reports_dir)):
-                dest_path = reports_dir / os.path.basename(report_path)
-                try:
-                    shutil.copy(report_path, dest_path)
-                except Exception:
-                    pass
-                report_path = str(dest_path)
-
-            download_url = f"/static/reports/{os.path.basename(report_path)}"
+            download_url = f"/static/reports/{report_filename}"
             
             return {
                 "status": "success",
@@ -136,211 +338,72 @@ class BacktestReportGenerator(BaseWidget):
                 "download_url": ""
             }
             
-    def _generate_html_report(self, backtest_results, strategy_name, include_charts, include_trades):
+    def _generate_html_report(self, report_path, backtest_results, strategy_name, include_charts, include_trades,
+                              return_body=True):
         """Generate an HTML report"""
         
-        # Create a temporary file for the report
-        reports_dir = pathlib.Path(WEB_BUILD_DIR) / "reports"
-        reports_dir.mkdir(parents=True, exist_ok=True)
-
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        safe_name = "".join(c if c.isalnum() else "_" for c in strategy_name)
-        report_filename = f"{safe_name}_{timestamp}.html"
-        report_path = str(reports_dir / report_filename)
-        
-        # Start building the HTML content
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Backtest Report: {strategy_name}</title>
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    line-height: 1.6;
-                    margin: 20px;
-                    color: #333;
-                }}
-                h1, h2, h3 {{
-                    color: #2c3e50;
-                }}
-                .summary-box {{
-                    background-color: #f8f9fa;
-                    border: 1px solid #dee2e6;
-                    border-radius: 5px;
-                    padding: 15px;
-                    margin-bottom: 20px;
-                }}
-                table {{
-                    border-collapse: collapse;
-                    width: 100%;
-                    margin-bottom: 20px;
-                }}
-                th, td {{
-                    border: 1px solid #dee2e6;
-                    padding: 8px 12px;
-                    text-align: left;
-                }}
-                th {{
-                    background-color: #e9ecef;
-                }}
-                tr:nth-child(even) {{
-                    background-color: #f2f2f2;
-                }}
-                .chart-container {{
-                    margin-bottom: 30px;
-                }}
-                .profit {{
-                    color: green;
-                }}
-                .loss {{
-                    color: red;
-                }}
-            </style>
-            <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-        </head>
-        <body>
-            <h1>Backtest Report: {strategy_name}</h1>
-            <div class="summary-box">
-                <h2>Performance Summary</h2>
-                <table>
-                    <tr>
-                        <th>Metric</th>
-                        <th>Value</th>
-                    </tr>
-                    <tr>
-                        <td>Net Profit</td>
-                        <td>{backtest_results.get('net_profit_percent', 'N/A')}%</td>
-                    </tr>
-                    <tr>
-                        <td>Total Trades</td>
-                        <td>{backtest_results.get('total_trades', 'N/A')}</td>
-                    </tr>
-                    <tr>
-                        <td>Win Rate</td>
-                        <td>{backtest_results.get('win_rate', 'N/A')}%</td>
-                    </tr>
-                    <tr>
-                        <td>Profit Factor</td>
-                        <td>{backtest_results.get('profit_factor', 'N/A')}</td>
-                    </tr>
-                    <tr>
-                        <td>Max Drawdown</td>
-                        <td>{backtest_results.get('max_drawdown_percent', 'N/A')}%</td>
-                    </tr>
-                    <tr>
-                        <td>Sharpe Ratio</td>
-                        <td>{backtest_results.get('sharpe_ratio', 'N/A')}</td>
-                    </tr>
-                </table>
-            </div>
-        """
+        # Start building the HTML content; fragments are joined once at the end
+        parts = []
+        parts.append(_HTML_HEAD.format(name=strategy_name))
+        summary_rows = "".join(
+            _SUMMARY_ROW_TEMPLATE.format(label=label, value=backtest_results.get(key, 'N/A'), suffix=suffix)
+            for label, key, suffix in _SUMMARY_ROWS
+        )
+        parts.append(_SUMMARY_TEMPLATE.format(rows=summary_rows))
         
         # Add charts if requested
         if include_charts and 'chart_data' in backtest_results:
-            html_content += """
-            <h2>Performance Charts</h2>
-            <div class="chart-container">
-                <div id="equity-chart" style="width: 100%; height: 400px;"></div>
-            </div>
-            <div class="chart-container">
-                <div id="drawdown-chart" style="width: 100%; height: 300px;"></div>
-            </div>
-            <div class="chart-container">
-                <div id="monthly-returns-chart" style="width: 100%; height: 300px;"></div>
-            </div>
-            
-            <script>
-            """
+            chart_data = backtest_results.get('chart_data', {})
             
-            # Add chart data and plotting code
-            if 'equity_curve' in backtest_results.get('chart_data', {}):
-                equity_data = backtest_results['chart_data']['equity_curve']
-                html_content += f"""
-                var equityData = {{
-                    x: {json.dumps(equity_data.get('x', []))},
-                    y: {json.dumps(equity_data.get('y', []))},
-                    mode: 'lines',
-                    name: 'Equity Curve',
-                    line: {{
-                        color: 'rgb(31, 119, 180)',
-                        width: 2
-                    }}
-                }};
-                
-                var equityLayout = {{
-                    title: 'Equity Curve',
-                    xaxis: {{
-                        title: 'Time'
-                    }},
-                    yaxis: {{
-                        title: 'Equity (%)'
-                    }}
-                }};
-                
-                Plotly.newPlot('equity-chart', [equityData], equityLayout);
-                """
+            # Collect every series into one payload; a fixed bootstrap script plots it client-side
+            charts = {}
+            if 'equity_curve' in chart_data:
+                equity_data = chart_data['equity_curve']
+                charts['equity'] = {
+                    "trace": {
+                        "x": equity_data.get('x', []),
+                        "y": equity_data.get('y', []),
+                        "mode": "lines",
+                        "name": "Equity Curve",
+                        "line": {"color": "rgb(31, 119, 180)", "width": 2},
+                    },
+                    "layout": _EQUITY_LAYOUT,
+                }
             
-            if 'drawdown_curve' in backtest_results.get('chart_data', {}):
-                drawdown_data = backtest_results['chart_data']['drawdown_curve']
-                html_content += f"""
-                var drawdownData = {{
-                    x: {json.dumps(drawdown_data.get('x', []))},
-                    y: {json.dumps(drawdown_data.get('y', []))},
-                    mode: 'lines',
-                    name: 'Drawdown',
-                    line: {{
-                        color: 'rgb(214, 39, 40)',
-                        width: 2
-                    }},
-                    fill: 'tozeroy'
-                }};
-                
-                var drawdownLayout = {{
-                    title: 'Drawdown Chart',
-                    xaxis: {{
-                        title: 'Time'
-                    }},
-                    yaxis: {{
-                        title: 'Drawdown (%)'
-                    }}
-                }};
-                
-                Plotly.newPlot('drawdown-chart', [drawdownData], drawdownLayout);
-                """
+            if 'drawdown_curve' in chart_data:
+                drawdown_data = chart_data['drawdown_curve']
+                charts['drawdown'] = {
+                    "trace": {
+                        "x": drawdown_data.get('x', []),
+                        "y": drawdown_data.get('y', []),
+                        "mode": "lines",
+                        "name": "Drawdown",
+                        "line": {"color": "rgb(214, 39, 40)", "width": 2},
+                        "fill": "tozeroy",
+                    },
+                    "layout": _DRAWDOWN_LAYOUT,
+                }
             
-            if 'monthly_returns' in backtest_results.get('chart_data', {}):
-                monthly_data = backtest_results['chart_data']['monthly_returns']
-                html_content += f"""
-                var monthlyData = {{
-                    x: {json.dumps(monthly_data.get('x', []))},
-                    y: {json.dumps(monthly_data.get('y', []))},
-                    type: 'bar',
-                    marker: {{
-                        color: {json.dumps(['rgb(44, 160, 44)' if y >= 0 else 'rgb(214, 39, 40)' for y in monthly_data.get('y', [])])}
-                    }}
-                }};
-                
-                var monthlyLayout = {{
-                    title: 'Monthly Returns',
-                    xaxis: {{
-                        title: 'Month'
-                    }},
-                    yaxis: {{
-                        title: 'Return (%)'
-                    }}
-                }};
-                
-                Plotly.newPlot('monthly-returns-chart', [monthlyData], monthlyLayout);
-                """
+            if 'monthly_returns' in chart_data:
+                monthly_data = chart_data['monthly_returns']
+                charts['monthly'] = {
+                    "trace": {
+                        "x": monthly_data.get('x', []),
+                        "y": monthly_data.get('y', []),
+                        "type": "bar",
+                        "marker": {"color": _bar_colors(monthly_data.get('y', []))},
+                    },
+                    "layout": _MONTHLY_LAYOUT,
+                }
             
-            html_content += """
-            </script>
-            """
+            parts.append(_CHARTS_SECTION)
+            # Escape "</" so chart labels can never terminate the enclosing <script> element
+            parts.append(_CHART_DATA_TEMPLATE.format(payload=_dumps(charts).replace("</", "<\\/")))
+            parts.append(_CHART_BOOTSTRAP)
         
         # Add trades table if requested
         if include_trades and 'trades' in backtest_results:
-            html_content += """
+            parts.append("""
             <h2>Trade History</h2>
             <table>
                 <tr>
@@ -353,55 +416,53 @@ class BacktestReportGenerator(BaseWidget):
                     <th>Profit/Loss</th>
                     <th>P/L (%)</th>
                 </tr>
-            """
+            """)
             
-            for trade in backtest_results['trades']:
-                profit_class = "profit" if trade.get('profit_percent', 0) >= 0 else "loss"
-                html_content += f"""
-                <tr>
-                    <td>{trade.get('id', 'N/A')}</td>
-                    <td>{trade.get('entry_date', 'N/A')}</td>
-                    <td>{trade.get('exit_date', 'N/A')}</td>
-                    <td>{trade.get('side', 'N/A')}</td>
-                    <td>{trade.get('entry_price', 'N/A')}</td>
-                    <td>{trade.get('exit_price', 'N/A')}</td>
-                    <td class="{profit_class}">{trade.get('profit_amount', 0)}</td>
-                    <td class="{profit_class}">{trade.get('profit_percent', 0)}%</td>
-                </tr>
-                """
+            trades = backtest_results['trades']
+            rows = []
+            for trade, cls in zip(trades, _profit_classes(trades)):
+                rows.append(_TRADE_ROW_TEMPLATE.format(
+                    id=trade.get('id', 'N/A'),
+                    entry_date=trade.get('entry_date', 'N/A'),
+                    exit_date=trade.get('exit_date', 'N/A'),
+                    side=trade.get('side', 'N/A'),
+                    entry_price=trade.get('entry_price', 'N/A'),
+                    exit_price=trade.get('exit_price', 'N/A'),
+                    cls=cls,
+                    profit_amount=trade.get('profit_amount', 0),
+                    profit_percent=trade.get('profit_percent', 0),
+                ))
+            parts.append("".join(rows))
                 
-            html_content += """
+            parts.append("""
             </table>
-            """
+            """)
         
         # Close HTML
-        html_content += """
+        parts.append("""
         </body>
         </html>
-        """
-        
-        # Write to file
-        with open(report_path, 'w') as f:
-            f.write(html_content)
+        """)
+
+        # Write to file; skip materializing the full document unless the caller wants it
+        if not return_body:
+            with open(report_path, 'wb', buffering=1 << 16) as f:
+                f.writelines(part.encode('utf-8') for part in parts)
+            return ""
+
+        html_content = "".join(parts)
+        with open(report_path, 'wb') as f:
+            f.write(html_content.encode('utf-8'))
             
-        return report_path, html_content
+        return html_content
         
-    def _generate_json_report(self, backtest_results, strategy_name, include_charts, include_trades):
+    def _generate_json_report(self, report_path, backtest_results, strategy_name, include_charts, include_trades, now):
         """Generate a JSON report"""
         
-        # Create a temporary file for the report
-        reports_dir = pathlib.Path(WEB_BUILD_DIR) / "reports"
-        reports_dir.mkdir(parents=True, exist_ok=True)
-
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        safe_name = "".join(c if c.isalnum() else "_" for c in strategy_name)
-        report_filename = f"{safe_name}_{timestamp}.json"
-        report_path = str(reports_dir / report_filename)
-        
         # Copy the results and add metadata
         report_data = {
             "strategy_name": strategy_name,
-            "generation_time": datetime.now().isoformat(),
+            "generation_time": now.isoformat(),
             "summary": {
                 "net_profit_percent": backtest_results.get('net_profit_percent', None),
                 "total_trades": backtest_results.get('total_trades', None),
@@ -427,53 +488,89 @@ class BacktestReportGenerator(BaseWidget):
             report_data["configuration"] = backtest_results.get('strategy_config', {})
             
         # Write to file
-        with open(report_path, 'w') as f:
-            json.dump(report_data, f, indent=2)
+        if orjson is not None:
+            blob = orjson.dumps(report_data, option=orjson.OPT_INDENT_2)
+            with open(report_path, 'wb') as f:
+                f.write(blob)
+            return blob.decode()
+
+        json_content = json.dumps(report_data, indent=2)
+        with open(report_path, 'wb') as f:
+            f.write(json_content.encode('utf-8'))
             
-        return report_path, json.dumps(report_data, indent=2)
+        return json_content
         
-    def _generate_csv_report(self, backtest_results, strategy_name, include_trades):
+    def _generate_csv_report(self, report_path, backtest_results, strategy_name, include_trades, now):
         """Generate a CSV report"""
         
-        # Create a temporary file for the report
-        reports_dir = pathlib.Path(WEB_BUILD_DIR) / "reports"
-        reports_dir.mkdir(parents=True, exist_ok=True)
-
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        safe_name = "".join(c if c.isalnum() else "_" for c in strategy_name)
-        report_filename = f"{safe_name}_{timestamp}.csv"
-        report_path = str(reports_dir / report_filename)
+        # Build the report in one buffer; csv.writer handles field quoting
+        buf = io.StringIO()
+        buf.write(f"# Backtest Report: {strategy_name}\n")
+        buf.write(f"# Generated: {now.strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        writer = csv.writer(buf, lineterminator="\n")
         
-        # Start with headers and summary
-        csv_content = f"# Backtest Report: {strategy_name}\n"
-        csv_content += f"# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-        
-        csv_content += "## Performance Summary\n"
-        csv_content += "Metric,Value\n"
-        csv_content += f"Net Profit,{backtest_results.get('net_profit_percent', 'N/A')}%\n"
-        csv_content += f"Total Trades,{backtest_results.get('total_trades', 'N/A')}\n"
-        csv_content += f"Winning Trades,{backtest_results.get('winning_trades', 'N/A')}\n"
-        csv_content += f"Losing Trades,{backtest_results.get('losing_trades', 'N/A')}\n"
-        csv_content += f"Win Rate,{backtest_results.get('win_rate', 'N/A')}%\n"
-        csv_content += f"Profit Factor,{backtest_results.get('profit_factor', 'N/A')}\n"
-        csv_content += f"Max Drawdown,{backtest_results.get('max_drawdown_percent', 'N/A')}%\n"
-        csv_content += f"Sharpe Ratio,{backtest_results.get('sharpe_ratio', 'N/A')}\n\n"
+        buf.write("## Performance Summary\n")
+        writer.writerows([
+            ("Metric", "Value"),
+            ("Net Profit", f"{backtest_results.get('net_profit_percent', 'N/A')}%"),
+            ("Total Trades", backtest_results.get('total_trades', 'N/A')),
+            ("Winning Trades", backtest_results.get('winning_trades', 'N/A')),
+            ("Losing Trades", backtest_results.get('losing_trades', 'N/A')),
+            ("Win Rate", f"{backtest_results.get('win_rate', 'N/A')}%"),
+            ("Profit Factor", backtest_results.get('profit_factor', 'N/A')),
+            ("Max Drawdown", f"{backtest_results.get('max_drawdown_percent', 'N/A')}%"),
+            ("Sharpe Ratio", backtest_results.get('sharpe_ratio', 'N/A')),
+        ])
+        buf.write("\n")
         
         # Add trades if requested
         if include_trades and 'trades' in backtest_results:
-            csv_content += "## Trade History\n"
-            csv_content += "ID,Entry Date,Exit Date,Side,Entry Price,Exit Price,Profit/Loss,P/L (%)\n"
-            
-            for trade in backtest_results['trades']:
-                csv_content += f"{trade.get('id', '')},{trade.get('entry_date', '')},{trade.get('exit_date', '')},"
-                csv_content += f"{trade.get('side', '')},{trade.get('entry_price', '')},{trade.get('exit_price', '')},"
-                csv_content += f"{trade.get('profit_amount', '')},{trade.get('profit_percent', '')}%\n"
+            buf.write("## Trade History\n")
+            writer.writerow(("ID", "Entry Date", "Exit Date", "Side", "Entry Price", "Exit Price", "Profit/Loss", "P/L (%)"))
+            writer.writerows(
+                (trade.get('id', ''), trade.get('entry_date', ''), trade.get('exit_date', ''),
+                 trade.get('side', ''), trade.get('entry_price', ''), trade.get('exit_price', ''),
+                 trade.get('profit_amount', ''), f"{trade.get('profit_percent', '')}%")
+                for trade in backtest_results['trades']
+            )
+        
+        csv_content = buf.getvalue()
         
         # Write to file
-        with open(report_path, 'w') as f:
-            f.write(csv_content)
+        with open(report_path, 'wb') as f:
+            f.write(csv_content.encode('utf-8'))
+            
+        return csv_content
+
+    def _generate_parquet_report(self, report_path, backtest_results, strategy_name, include_trades, now):
+        """Generate a Parquet report (trades as rows, summary in the file metadata)"""
+        
+        trades = backtest_results.get('trades', []) if include_trades else []
+        table = pa.Table.from_pylist(trades)
+        
+        # Summary metrics travel as JSON in the schema metadata
+        summary = {
+            "strategy_name": strategy_name,
+            "generation_time": now.isoformat(),
+            "net_profit_percent": backtest_results.get('net_profit_percent', None),
+            "total_trades": backtest_results.get('total_trades', None),
+            "winning_trades": backtest_results.get('winning_trades', None),
+            "losing_trades": backtest_results.get('losing_trades', None),
+            "win_rate": backtest_results.get('win_rate', None),
+            "profit_factor": backtest_results.get('profit_factor', None),
+            "max_drawdown_percent": backtest_results.get('max_drawdown_percent', None),
+            "sharpe_ratio": backtest_results.get('sharpe_ratio', None),
+        }
+        table = table.replace_schema_metadata({"backtest_summary": _dumps(summary)})
+        
+        # Serialize once in memory, then write the bytes and return them base64-encoded
+        sink = pa.BufferOutputStream()
+        pq.write_table(table, sink, compression='zstd')
+        blob = sink.getvalue().to_pybytes()
+        with open(report_path, 'wb') as f:
+            f.write(blob)
             
-        return report_path, csv_content
+        return base64.b64encode(blob).decode('ascii')
 
 if __name__ == "__main__":
     import time
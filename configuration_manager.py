@@ -1,32 +1,216 @@
 import os
 import json
+import mmap
+import stat
+import tempfile
 from typing import Dict, Any
 from pydantic import Field
 
+try:
+    import orjson  # optional fast JSON backend
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson  # optional, speeds up large files when orjson is missing
+except ImportError:
+    simdjson = None
+
 from proconfig.widgets.base import WIDGETS, BaseWidget
 
 # ------------------------ helper wrappers (module-level)
+# Python type of a field default -> schema type name; anything else is a string
+_TYPE_MAP = {
+    bool: "boolean",
+    int: "integer",
+    float: "number",
+    list: "array",
+    tuple: "array",
+    dict: "object",
+}
+
+
 def Input(*args, **kwargs):
     if "type" not in kwargs:
-        default_val = args[0] if args else None
-        if isinstance(default_val, bool):
-            kwargs["type"] = "boolean"
-        elif isinstance(default_val, int):
-            kwargs["type"] = "integer"
-        elif isinstance(default_val, float):
-            kwargs["type"] = "number"
-        elif isinstance(default_val, (list, tuple)):
-            kwargs["type"] = "array"
-        elif isinstance(default_val, dict):
-            kwargs["type"] = "object"
-        else:
-            kwargs["type"] = "string"
+        kwargs["type"] = _TYPE_MAP.get(type(args[0]) if args else None, "string")
     return Field(*args, **kwargs)
 
 
 def Output(*args, **kwargs):
     return Input(*args, **kwargs)
 
+
+def _loads(data):
+    """Parse JSON from str or bytes, preferring orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(obj):
+    """Serialize obj to indented, newline-terminated UTF-8 JSON bytes, preferring orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, ensure_ascii=False, indent=2) + "\n").encode('utf-8')
+
+
+# Files larger than this are memory-mapped and parsed in place instead of copied into a bytes object
+_MMAP_THRESHOLD = 64 * 1024
+
+
+# Skip the access-time update on Linux; 0 where the flag does not exist
+_O_NOATIME = getattr(os, "O_NOATIME", 0)
+
+
+def _open_readonly(path):
+    """Open path for reading as a raw file descriptor."""
+    try:
+        return os.open(path, os.O_RDONLY | _O_NOATIME)
+    except PermissionError:
+        if not _O_NOATIME:
+            raise
+        # O_NOATIME is only permitted to the file's owner
+        return os.open(path, os.O_RDONLY)
+
+
+def _read_fd(fd, size):
+    """Read size bytes from fd, bypassing Python's buffered/text io layers."""
+    data = os.read(fd, size)
+    while len(data) < size:
+        chunk = os.read(fd, size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def _read_json(path):
+    """Parse the JSON file at path."""
+    fd = _open_readonly(path)
+    try:
+        size = os.fstat(fd).st_size
+        if size > _MMAP_THRESHOLD:
+            if orjson is not None:
+                with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                    return orjson.loads(view)
+            if simdjson is not None:
+                return simdjson.loads(_read_fd(fd, size))
+        return _loads(_read_fd(fd, size))
+    finally:
+        os.close(fd)
+
+
+def _write_fd(fd, data):
+    """Write all of data to fd, bypassing Python's buffered io layer."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _write_file(path, data):
+    """Create or truncate the file at path and write data to it."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        _write_fd(fd, data)
+    finally:
+        os.close(fd)
+
+
+def _replace_json(path, obj):
+    """Atomically replace the file at path with obj serialized as JSON, keeping its permissions."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        try:
+            _write_fd(fd, _dumps(obj))
+        finally:
+            os.close(fd)
+        os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+# abspath -> (st_mtime_ns, st_size, raw bytes) of recently read small config files
+_PARSE_CACHE = {}
+_PARSE_CACHE_MAX = 32
+
+
+def _read_json_cached(path):
+    """Parse the JSON file at path, reusing the bytes of an unchanged file from a previous read."""
+    key = os.path.abspath(path)
+    st = os.stat(path)
+    if st.st_size > _MMAP_THRESHOLD:
+        return _read_json(path)
+    cached = _PARSE_CACHE.get(key)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        # Re-parse rather than share one dict so callers can never mutate the cache
+        return _loads(cached[2])
+    
+    fd = _open_readonly(path)
+    try:
+        st = os.fstat(fd)
+        raw = _read_fd(fd, st.st_size)
+    finally:
+        os.close(fd)
+    if len(_PARSE_CACHE) >= _PARSE_CACHE_MAX:
+        _PARSE_CACHE.pop(next(iter(_PARSE_CACHE)))
+    _PARSE_CACHE[key] = (st.st_mtime_ns, st.st_size, raw)
+    return _loads(raw)
+
+# Raised when a config path does not name a readable file
+_MISSING_FILE_ERRORS = (FileNotFoundError, IsADirectoryError, NotADirectoryError)
+
+
+def _error_response(message):
+    """Build the widget's error output."""
+    return {
+        "status": "error",
+        "message": message,
+        "config_data": {}
+    }
+
+
+# Known strategy names (casefolded) -> stem of the bundled configuration file
+_STRATEGY_CONFIGS = {
+    "btc spot position": "trading_config1",
+    "btc ma+adx": "trading_config2",
+}
+
+# Extensions tried for a strategy config, in order of preference
+_CONFIG_EXTENSIONS = (".JSON", ".json")
+
+# (working directory, stem) -> file name found on disk
+_RESOLVED_CONFIGS = {}
+
+
+def _resolve_config(stem):
+    """Find the configuration file for stem in the working directory, whatever the case of its extension."""
+    key = (os.getcwd(), stem)
+    resolved = _RESOLVED_CONFIGS.get(key)
+    if resolved is not None:
+        return resolved
+    
+    matches = {}
+    try:
+        with os.scandir(key[0]) as entries:
+            for entry in entries:
+                name, ext = os.path.splitext(entry.name)
+                if name == stem and ext.lower() == ".json":
+                    matches[ext] = entry.name
+    except OSError:
+        pass
+    if not matches:
+        # Nothing on disk (yet): let the read report the missing file
+        return stem + _CONFIG_EXTENSIONS[0]
+    resolved = next((matches[ext] for ext in _CONFIG_EXTENSIONS if ext in matches), None)
+    if resolved is None:
+        # Mixed-case extension such as ".Json"
+        resolved = next(iter(matches.values()))
+    _RESOLVED_CONFIGS[key] = resolved
+    return resolved
+
 # ------------------------------------------------------------------------------
 
 @WIDGETS.register_module()
@@ -46,38 +230,34 @@ class ConfigurationManager(BaseWidget):
         message: str = Output("", description="Human-readable message", type="string")
         config_data: Dict[str, Any] = Output({}, description="Configuration data", type="object")
         
+    # action name -> handler taking (widget, config)
+    ACTIONS = {
+        "load": lambda self, config: self._load_config(config.config_path, config.strategy_name, config.config_content),
+        "save": lambda self, config: self._save_config(config.config_path, config.config_data),
+        "update": lambda self, config: self._update_config(config.config_path, config.config_data),
+    }
+        
     def execute(self, environ, config):
         try:
             action = config.action.lower()
             
-            if action == "load":
-                return self._load_config(config.config_path, config.strategy_name, config.config_content)
-            elif action == "save":
-                return self._save_config(config.config_path, config.config_data)
-            elif action == "update":
-                return self._update_config(config.config_path, config.config_data)
-            else:
-                return {
-                    "status": "error",
-                    "message": f"Unknown action: {action}",
-                    "config_data": {}
-                }
+            handler = self.ACTIONS.get(action)
+            if handler is None:
+                return _error_response(f"Unknown action: {action}")
+            return handler(self, config)
                 
         except Exception as e:
-            return {
-                "status": "error",
-                "message": str(e),
-                "config_data": {}
-            }
+            return _error_response(str(e))
             
     def _load_config(self, config_path, strategy_name, config_content=None):
         """Load a configuration file or use direct content"""
         
-        # If direct content is provided, use it
-        if config_content and config_content != "{}":
+        # If direct content is provided, use it (blank text and the "{}" default count as absent)
+        if config_content and not (isinstance(config_content, str) and len(config_content) <= 2
+                                   and config_content.strip() in ("", "{}")):
             try:
                 if isinstance(config_content, str):
-                    config_data = json.loads(config_content)
+                    config_data = _loads(config_content)
                 else:
                     config_data = config_content
                 return {
@@ -86,86 +266,67 @@ class ConfigurationManager(BaseWidget):
                     "config_data": config_data
                 }
             except json.JSONDecodeError:
-                return {
-                    "status": "error",
-                    "message": "Invalid JSON configuration content provided",
-                    "config_data": {}
-                }
+                return _error_response("Invalid JSON configuration content provided")
         
         # If config_path is provided, load from the specific file
-        if config_path and os.path.isfile(config_path):
+        if config_path:
             try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    config_data = json.load(f)
-                return {
-                    "status": "success",
-                    "message": f"Loaded configuration from {config_path}",
-                    "config_data": config_data
-                }
-            except Exception as e:
-                return {
-                    "status": "error",
-                    "message": f"Failed to load configuration: {str(e)}",
-                    "config_data": {}
-                }
+                return self._read_json_file(config_path, f"Loaded configuration from {config_path}")
+            except _MISSING_FILE_ERRORS:
+                # Not a readable file: fall back to the strategy name lookup below
+                if not strategy_name:
+                    return _error_response(f"Configuration file not found: {config_path}")
         
         # If strategy_name is provided, find corresponding config
-        elif strategy_name:
+        if strategy_name:
             # Example: Look for known config files
-            if strategy_name.lower() == "btc spot position":
-                config_path = "trading_config1.JSON"
-            elif strategy_name.lower() == "btc ma+adx":
-                config_path = "trading_config2.JSON"
-            else:
-                return {
-                    "status": "error",
-                    "message": f"No configuration found for strategy: {strategy_name}",
-                    "config_data": {}
-                }
+            stem = _STRATEGY_CONFIGS.get(strategy_name.casefold())
+            if stem is None:
+                return _error_response(f"No configuration found for strategy: {strategy_name}")
                 
             # Try to load the identified config file
             try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    config_data = json.load(f)
-                return {
-                    "status": "success",
-                    "message": f"Loaded configuration for {strategy_name}",
-                    "config_data": config_data
-                }
-            except Exception as e:
-                return {
-                    "status": "error",
-                    "message": f"Failed to load configuration: {str(e)}",
-                    "config_data": {}
-                }
+                return self._read_json_file(_resolve_config(stem), f"Loaded configuration for {strategy_name}")
+            except _MISSING_FILE_ERRORS as e:
+                # The file was moved or renamed since it was resolved
+                _RESOLVED_CONFIGS.pop((os.getcwd(), stem), None)
+                return _error_response(f"Failed to load configuration: {str(e)}")
         
         else:
-            return {
-                "status": "error",
-                "message": "No configuration path, content, or strategy name provided",
-                "config_data": {}
-            }
+            return _error_response("No configuration path, content, or strategy name provided")
+            
+    def _read_json_file(self, path, success_msg):
+        """Load the JSON file at path into a success response; missing-file errors are left to the caller"""
+        try:
+            config_data = _read_json_cached(path)
+        except _MISSING_FILE_ERRORS:
+            raise
+        except Exception as e:
+            return _error_response(f"Failed to load configuration: {str(e)}")
+        return {
+            "status": "success",
+            "message": success_msg,
+            "config_data": config_data
+        }
             
     def _save_config(self, config_path, config_data_str):
         """Save a configuration file"""
         
         if not config_path:
-            return {
-                "status": "error",
-                "message": "No configuration path provided",
-                "config_data": {}
-            }
+            return _error_response("No configuration path provided")
             
         try:
-            # Parse the config data
+            # Parse the config data; text input is only validated and then written verbatim
             if isinstance(config_data_str, str):
-                config_data = json.loads(config_data_str)
+                config_data = _loads(config_data_str)
+                payload = config_data_str.encode('utf-8')
             else:
                 config_data = config_data_str
+                payload = _dumps(config_data)
                 
             # Save to file
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(config_data, f, ensure_ascii=False, indent=2)
+            _write_file(config_path, payload)
+            _PARSE_CACHE.pop(os.path.abspath(config_path), None)
                 
             return {
                 "status": "success",
@@ -174,39 +335,30 @@ class ConfigurationManager(BaseWidget):
             }
             
         except Exception as e:
-            return {
-                "status": "error",
-                "message": f"Failed to save configuration: {str(e)}",
-                "config_data": {}
-            }
+            return _error_response(f"Failed to save configuration: {str(e)}")
             
     def _update_config(self, config_path, config_data_str):
         """Update an existing configuration file"""
         
-        if not config_path or not os.path.isfile(config_path):
-            return {
-                "status": "error",
-                "message": f"Configuration file not found: {config_path}",
-                "config_data": {}
-            }
+        if not config_path:
+            return _error_response(f"Configuration file not found: {config_path}")
             
         try:
+            # Load existing config
+            existing_config = _read_json(config_path)
+            
             # Parse the update data
             if isinstance(config_data_str, str):
-                update_data = json.loads(config_data_str)
+                update_data = _loads(config_data_str)
             else:
                 update_data = config_data_str
                 
-            # Load existing config
-            with open(config_path, 'r', encoding='utf-8') as f:
-                existing_config = json.load(f)
-                
             # Update the config
             existing_config.update(update_data)
             
-            # Save back to file
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(existing_config, f, ensure_ascii=False, indent=2)
+            # Save back to file; a crash mid-write leaves the original intact
+            _replace_json(config_path, existing_config)
+            _PARSE_CACHE.pop(os.path.abspath(config_path), None)
                 
             return {
                 "status": "success",
@@ -214,9 +366,7 @@ class ConfigurationManager(BaseWidget):
                 "config_data": existing_config
             }
             
+        except _MISSING_FILE_ERRORS:
+            return _error_response(f"Configuration file not found: {config_path}")
         except Exception as e:
-            return {
-                "status": "error",
-                "message": f"Failed to update configuration: {str(e)}",
-                "config_data": {}
-            } 
\ No newline at end of file
+            return _error_response(f"Failed to update configuration: {str(e)}") 
\ No newline at end of file
@@ -1,34 +1,292 @@
 import os
+import copy
 import json
-import tempfile
+import time
+import random
+import hashlib
 import re  # Added import
-from typing import Dict, Any, List, Optional
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, Optional
 from pydantic import Field
 
+try:
+    import orjson  # optional fast JSON backend
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np  # optional, vectorizes the simulated backtest
+except ImportError:
+    np = None
+
+try:
+    import requests  # live prices for the simulation baseline; without it the mock price ranges are used
+except ImportError:
+    requests = None
+
+try:
+    from numba import njit  # optional, compiles the sequential equity accounting to native code
+except ImportError:
+    njit = None
+
 from proconfig.widgets.base import WIDGETS, BaseWidget
 
 # ------------------------ helper wrappers (module-level) ------------------------
+# Python type of a field default -> schema type name; anything else is a string
+_TYPE_MAP = {
+    bool: "boolean",
+    int: "integer",
+    float: "number",
+    list: "array",
+    tuple: "array",
+    dict: "object",
+}
+
+
 def Input(*args, **kwargs):
     if "type" not in kwargs:
-        default_val = args[0] if args else None
-        if isinstance(default_val, bool):
-            kwargs["type"] = "boolean"
-        elif isinstance(default_val, int):
-            kwargs["type"] = "integer"
-        elif isinstance(default_val, float):
-            kwargs["type"] = "number"
-        elif isinstance(default_val, (list, tuple)):
-            kwargs["type"] = "array"
-        elif isinstance(default_val, dict):
-            kwargs["type"] = "object"
-        else:
-            kwargs["type"] = "string"
+        kwargs["type"] = _TYPE_MAP.get(type(args[0]) if args else None, "string")
     return Field(*args, **kwargs)
 
 
 def Output(*args, **kwargs):
     return Input(*args, **kwargs)
 
+
+def _loads(data):
+    """Parse a JSON document, preferring orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Seconds a looked-up price is reused before the price APIs are asked again
+_PRICE_TTL = 30.0
+# Failed lookups are retried sooner, without hammering an API that is down
+_PRICE_MISS_TTL = 5.0
+
+# Timeout in seconds for each price API request
+_PRICE_TIMEOUT = 2
+
+# CoinGecko id (or lower-cased symbol when unknown) -> (price or None, time.monotonic() it expires at)
+_PRICE_CACHE = {}
+
+_HTTP_SESSION = None
+
+
+def _http_session():
+    """Shared requests session so repeated lookups reuse pooled connections."""
+    global _HTTP_SESSION
+    if _HTTP_SESSION is None:
+        _HTTP_SESSION = requests.Session()
+    return _HTTP_SESSION
+
+
+# quick symbol→id mapping for the CoinGecko API
+_COINGECKO_IDS = {
+    "btc": "bitcoin",
+    "btcusd": "bitcoin",
+    "btc-usd": "bitcoin",
+    "btc/usd": "bitcoin",
+    "eth": "ethereum",
+    "ethusd": "ethereum",
+    "eth-usd": "ethereum",
+    "eth/usd": "ethereum",
+}
+
+
+def _coingecko_id(sym: str) -> Optional[str]:
+    """CoinGecko coin id for a trading symbol, or None when it is not a known coin."""
+    sym_low = sym.lower()
+    # strip non-alpha chars for generic mapping (e.g. BTCUSDT -> btcusdt -> btc)
+    if sym_low not in _COINGECKO_IDS:
+        pure = _NONALPHA.sub("", sym_low)
+        if pure.endswith("usd"):
+            pure = pure[:-3]
+        if pure in _COINGECKO_IDS:
+            sym_low = pure
+    return _COINGECKO_IDS.get(sym_low)
+
+
+def _fetch_current_price(sym: str) -> Optional[float]:
+    """Return current USD price for a given crypto symbol, reusing a lookup that has not expired yet."""
+    return _fetch_prices([sym])[sym]
+
+
+def _fetch_prices(symbols) -> Dict[str, Optional[float]]:
+    """Current USD price (or None) of each symbol; symbols without a fresh cached price share one request."""
+    now = time.monotonic()
+    prices = {}
+    missing = []
+    for sym in symbols:
+        # Spellings of the same coin (BTCUSD, btc-usd, ...) share one entry
+        cached = _PRICE_CACHE.get(_coingecko_id(sym) or sym.lower())
+        if cached is not None and now < cached[1]:
+            prices[sym] = cached[0]
+        else:
+            missing.append(sym)
+    if missing:
+        fetched = _request_prices({_coingecko_id(sym) for sym in missing} - {None})
+        # Every coin in the response is cached, not just the requested ones
+        for cg_id, price in fetched.items():
+            _PRICE_CACHE[cg_id] = (price, now + _PRICE_TTL)
+        for sym in missing:
+            key = _coingecko_id(sym) or sym.lower()
+            price = prices[sym] = fetched.get(key)
+            if price is None:
+                _PRICE_CACHE[key] = (None, now + _PRICE_MISS_TTL)
+    return prices
+
+
+def _request_prices(cg_ids) -> Dict[str, float]:
+    """
+    USD price per CoinGecko id. One simple/price call asks for every known coin at once, so
+    runs that alternate between symbols are served from the cache; BTC falls back to CoinDesk.
+    """
+    prices = {}
+    if not cg_ids or requests is None:
+        return prices
+    try:
+        resp = _http_session().get(
+            "https://api.coingecko.com/api/v3/simple/price",
+            params={"ids": ",".join(sorted(set(_COINGECKO_IDS.values()) | set(cg_ids))), "vs_currencies": "usd"},
+            timeout=_PRICE_TIMEOUT,
+        )
+        if resp.status_code == 200:
+            for cg_id, quote in resp.json().items():
+                try:
+                    prices[cg_id] = float(quote["usd"])
+                except (KeyError, TypeError, ValueError):
+                    pass
+    except Exception:
+        pass
+
+    # Fallback to CoinDesk API if CoinGecko could not price BTC
+    if "bitcoin" in cg_ids and "bitcoin" not in prices:
+        try:
+            resp = _http_session().get("https://api.coindesk.com/v1/bpi/currentprice/USD.json", timeout=_PRICE_TIMEOUT)
+            if resp.status_code == 200:
+                prices["bitcoin"] = float(resp.json()["bpi"]["USD"]["rate_float"])
+        except Exception:
+            pass
+    return prices
+
+
+def _equity_path(profit_percent, position_size, initial_capital):
+    """
+    Step through the trades in order, compounding equity and tracking the high watermark.
+    Returns the profit amount of each trade and the maximum drawdown in percent.
+    Only used when numba is installed, which compiles it to a native loop.
+    """
+    profit_amount = np.empty(profit_percent.shape[0])
+    equity = initial_capital
+    high_watermark = initial_capital
+    max_drawdown = 0.0
+    for i in range(profit_percent.shape[0]):
+        profit_amount[i] = equity * position_size / 100 * profit_percent[i] / 100
+        equity += profit_amount[i]
+        if equity > high_watermark:
+            high_watermark = equity
+        drawdown = (high_watermark - equity) / high_watermark * 100
+        if drawdown > max_drawdown:
+            max_drawdown = drawdown
+    return profit_amount, max_drawdown
+
+
+if njit is not None:
+    # nogil lets concurrent backtests run the compiled loop in parallel threads
+    _equity_path = njit(cache=True, nogil=True)(_equity_path)
+
+# Script input declarations that _apply_config can override: (pattern, config key, value format).
+# Group 1 is the call up to its opening parenthesis; the rest of the match is the first argument.
+_APPLY_CONFIG_PATTERNS = tuple((re.compile(pattern), cfg_key, fmt) for pattern, cfg_key, fmt in (
+    # 策略1 specific keys
+    (r"(benchmarkSymbol\s*=\s*input\.symbol\()\s*[^,)]*", "对标标的", '"{}"'),
+    (r"(ma_length1\s*=\s*input\.int\()\s*[^,)]*", "MAX1长度", '{}'),
+    (r"(ma_length2\s*=\s*input\.int\()\s*[^,)]*", "MAX2长度", '{}'),
+    (r"(threshold\s*=\s*input\.float\()\s*[^,)]*", "突破门槛(%)", '{} / 100'),
+    # 策略2 specific keys
+    (r"(ma120_length\s*=\s*input\.int\()\s*[^,)]*", "MA120Length", '{}'),
+    (r"(adx_length\s*=\s*input\.int\()\s*[^,)]*", "ADXLength", '{}'),
+    (r"(adx_smoothing\s*=\s*input\.int\()\s*[^,)]*", "ADX平滑", '{}'),
+    (r"(threshold\s*=\s*input\.float\()\s*[^,)]*", "Threshold(%)", '{} / 100'),
+    (r"(adxhlin\s*=\s*input\.int\()\s*[^,)]*", "Adx阈值", '{}'),
+    # Note: start/end dates are handled separately in execute method
+))
+
+# Config keys that _apply_config acts on
+_APPLY_CONFIG_KEYS = frozenset(cfg_key for _, cfg_key, _ in _APPLY_CONFIG_PATTERNS)
+
+_NONALPHA = re.compile(r"[^a-z]")
+
+# First line containing "strategy(": captures from its first double quote up to the next one (or end of line);
+# the group is None when that line has no quote
+_STRATEGY_NAME_RE = re.compile(r'^(?=[^\n]*strategy\()[^"\n]*(?:"([^"\n]*))?', re.M)
+
+# Fields of a simulated trade, in output order
+_TRADE_FIELDS = ("id", "entry_date", "exit_date", "side", "entry_price", "exit_price", "profit_percent", "profit_amount")
+
+
+if np is not None:
+    # One simulated trade per row of a structured array, so each field is a contiguous column
+    _TRADE_DTYPE = np.dtype([
+        ("id", "i4"),
+        ("entry_date", "datetime64[D]"),
+        ("exit_date", "datetime64[D]"),
+        ("side", "u1"),  # 1 = Long, 0 = Short
+        ("entry_price", "f8"),
+        ("exit_price", "f8"),
+        ("profit_percent", "f8"),
+        ("profit_amount", "f8"),
+    ])
+
+
+def _trade_columns(trade_array):
+    """Turn a _TRADE_DTYPE array into the "columns" trades layout: one list per field, in _TRADE_FIELDS order."""
+    return {
+        "id": trade_array["id"].tolist(),
+        "entry_date": trade_array["entry_date"].astype(str).tolist(),
+        "exit_date": trade_array["exit_date"].astype(str).tolist(),
+        "side": np.where(trade_array["side"] == 1, "Long", "Short").tolist(),
+        "entry_price": trade_array["entry_price"].tolist(),
+        "exit_price": trade_array["exit_price"].tolist(),
+        "profit_percent": trade_array["profit_percent"].tolist(),
+        "profit_amount": trade_array["profit_amount"].tolist(),
+    }
+
+
+def _trade_records(trade_array):
+    """Turn a _TRADE_DTYPE array into the list of trade records returned to callers."""
+    return [dict(zip(_TRADE_FIELDS, row)) for row in zip(*_trade_columns(trade_array).values())]
+
+
+def _simulation_seed(script_content, symbol, timeframe):
+    """Random seed for a simulation, stable across processes (unlike hash() of a str)."""
+    digest = hashlib.blake2b(digest_size=8)
+    for part in (script_content, symbol, timeframe):
+        digest.update(part.encode("utf-8"))
+    return int.from_bytes(digest.digest(), "little")
+
+
+# (script digest, simulation parameters, live price) -> backtest results, for opt-in memoization
+_SIMULATION_CACHE = {}
+_SIMULATION_CACHE_MAX = 256
+
+# (input digest, time.monotonic() expiry, execute output) of the latest successful cached run
+_LAST_RESULT = None
+
+
+def _execute_digest(script_content, config):
+    """Digest of everything that determines the output of a simulation-mode execute call."""
+    digest = hashlib.blake2b(script_content.encode("utf-8"), digest_size=16)
+    digest.update(repr((
+        config.symbol, config.timeframe, config.start_date, config.end_date or date.today().isoformat(),
+        config.initial_capital, config.position_size, config.commission_percent,
+        config.config_json, config.trades_format.lower()
+    )).encode("utf-8"))
+    return digest.digest()
+
 # ------------------------------------------------------------------------------
 
 @WIDGETS.register_module()
@@ -48,6 +306,8 @@ class PineScriptExecutor(BaseWidget):
         commission_percent: float = Input(0.1, description="Commission percent per trade", type="number")
         simulation_mode: bool = Input(True, description="Run in simulation mode without TradingView API", type="boolean")
         config_json: str = Input("", description="Optional JSON config to override script inputs", type="string")
+        trades_format: str = Input("records", description="Layout of backtest_results.trades: records (list of trades) or columns (one array per field, smaller payload)", type="string")
+        cache_results: bool = Input(False, description="Reuse the results of an identical earlier simulation in this process", type="boolean")
         
     class OutputsSchema(BaseWidget.OutputsSchema):
         status: str = Output("", description="Execution status", type="string")
@@ -57,6 +317,7 @@ class PineScriptExecutor(BaseWidget):
         backtest_results: Dict[str, Any] = Output({}, description="Backtest result object", type="object")
         
     def execute(self, environ, config):
+        global _LAST_RESULT
         try:
             # Determine if we're using file path or direct content
             use_direct_content = bool(config.script_content and config.script_content.strip())
@@ -76,11 +337,19 @@ class PineScriptExecutor(BaseWidget):
                     "backtest_results": {}
                 }
                 
+            # Identical back-to-back runs are answered from the previous output, for as long as
+            # the live price it used (or its failed lookup) would itself still be served from the price cache
+            if config.cache_results and config.simulation_mode:
+                run_digest = _execute_digest(script_content, config)
+                last = _LAST_RESULT
+                if last is not None and last[0] == run_digest and time.monotonic() < last[1]:
+                    return copy.deepcopy(last[2])
+                    
             # Parse JSON config and apply it
             cfg = {}
             if config.config_json:
                 try:
-                    cfg = json.loads(config.config_json)
+                    cfg = _loads(config.config_json)
                 except Exception:
                     pass # Ignore invalid JSON
 
@@ -99,6 +368,16 @@ class PineScriptExecutor(BaseWidget):
                     logging.debug(traceback.format_exc())
                     # continue with original script_content
 
+            trades_format = config.trades_format.lower()
+            if trades_format not in ("records", "columns"):
+                return {
+                    "status": "error",
+                    "message": f"Unsupported trades format: {config.trades_format}",
+                    "last_price": 0,
+                    "price_unavailable": True,
+                    "backtest_results": {}
+                }
+                
             # Check if we're in simulation mode
             if config.simulation_mode:
                 # In simulation mode, we'll generate a mock backtest result
@@ -110,16 +389,25 @@ class PineScriptExecutor(BaseWidget):
                     end_date=end_date[:10] if end_date else "",       # Use potentially overridden date
                     initial_capital=config.initial_capital,
                     position_size=config.position_size,
-                    commission_percent=config.commission_percent
+                    commission_percent=config.commission_percent,
+                    use_cache=config.cache_results,
+                    trades_format=trades_format
                 )
                 
-                return {
+                output = {
                     "status": "success",
                     "message": f"Executed Pine script in simulation mode for {config.symbol} on {config.timeframe} timeframe",
                     "last_price": backtest_results.get("last_price", 0),
                     "price_unavailable": backtest_results.get("price_unavailable", False),
                     "backtest_results": backtest_results
                 }
+                if config.cache_results:
+                    # A failed price lookup is retried after _PRICE_MISS_TTL, so its result must not outlive that
+                    price_entry = _PRICE_CACHE.get(_coingecko_id(config.symbol) or config.symbol.lower())
+                    price_missed = output["price_unavailable"] or price_entry is None or price_entry[0] is None
+                    ttl = _PRICE_MISS_TTL if price_missed else _PRICE_TTL
+                    _LAST_RESULT = (run_digest, time.monotonic() + ttl, copy.deepcopy(output))
+                return output
             else:
                 # In real mode, we would call the TradingView API
                 # This is a placeholder for future implementation
@@ -142,91 +430,29 @@ class PineScriptExecutor(BaseWidget):
             
     def _apply_config(self, script: str, cfg: dict) -> str:
         """Applies config values to the Pine script content using regex substitution."""
-        mapping = {
-            # 策略1 specific keys
-            r"(benchmarkSymbol\\s*=\\s*input\\.symbol\\()\\s*[^,)]*": ("对标标的", '"{}"'),
-            r"(ma_length1\\s*=\\s*input\\.int\\()\\s*[^,)]*": ("MAX1长度", '{}'),
-            r"(ma_length2\\s*=\\s*input\\.int\\()\\s*[^,)]*": ("MAX2长度", '{}'),
-            r"(threshold\\s*=\\s*input\\.float\\()\\s*[^,)]*": ("突破门槛(%)", '{} / 100'),
-            # 策略2 specific keys
-            r"(ma120_length\\s*=\\s*input\\.int\\()\\s*[^,)]*": ("MA120Length", '{}'),
-            r"(adx_length\\s*=\\s*input\\.int\\()\\s*[^,)]*": ("ADXLength", '{}'),
-            r"(adx_smoothing\\s*=\\s*input\\.int\\()\\s*[^,)]*": ("ADX平滑", '{}'),
-            r"(threshold\\s*=\\s*input\\.float\\()\\s*[^,)]*": ("Threshold(%)", '{} / 100'),
-            r"(adxhlin\\s*=\\s*input\\.int\\()\\s*[^,)]*": ("Adx阈值", '{}'),
-            # Note: start/end dates are handled separately in execute method
-        }
-        for pattern, (cfg_key, fmt) in mapping.items():
-            if cfg_key in cfg:
+        relevant = _APPLY_CONFIG_KEYS & cfg.keys()
+        if not relevant:
+            # e.g. only the dates, which execute handles itself
+            return script
+        for pattern, cfg_key, fmt in _APPLY_CONFIG_PATTERNS:
+            if cfg_key in relevant:
                 value = fmt.format(cfg[cfg_key])
                 # Substitute the first argument in the input function call
-                script = re.sub(pattern, rf"\\1{value}", script, count=1)
+                script = pattern.sub(lambda m: m.group(1) + value, script, count=1)
         return script
 
     def _simulate_backtest(self, script_content, symbol, timeframe, start_date, end_date, 
-                         initial_capital, position_size, commission_percent):
+                         initial_capital, position_size, commission_percent, use_cache=False,
+                         trades_format="records"):
         """
         Simulate a backtest without actually executing the Pine script.
         This is a placeholder for testing the widget workflow.
+        The simulation is seeded from its inputs, so with use_cache an identical run is served from memory.
         """
         
-        def _fetch_current_price(sym: str) -> Optional[float]:
-            """Return current USD price for a given crypto symbol using CoinGecko simple API."""
-            try:
-                import requests, re
-                sym_low = sym.lower()
-                # quick symbol→id mapping
-                mapping = {
-                    "btc": "bitcoin",
-                    "btcusd": "bitcoin",
-                    "btc-usd": "bitcoin",
-                    "btc/usd": "bitcoin",
-                    "eth": "ethereum",
-                    "ethusd": "ethereum",
-                    "eth-usd": "ethereum",
-                    "eth/usd": "ethereum",
-                }
-                # strip non-alpha chars for generic mapping (e.g. BTCUSDT -> btcusdt -> btc)
-                if sym_low not in mapping:
-                    pure = re.sub(r"[^a-z]", "", sym_low)
-                    if pure.endswith("usd"):
-                        pure = pure[:-3]
-                    if pure in mapping:
-                        sym_low = pure
-                cg_id = mapping.get(sym_low)
-                if not cg_id:
-                    return None
-                resp = requests.get(
-                    "https://api.coingecko.com/api/v3/simple/price",
-                    params={"ids": cg_id, "vs_currencies": "usd"},
-                    timeout=5,
-                )
-                if resp.status_code == 200:
-                    data = resp.json()
-                    return float(data[cg_id]["usd"])
-            except Exception:
-                pass
-
-            # Fallback to CoinDesk API if CoinGecko fails
-            try:
-                if sym.lower().startswith("btc"):
-                    import requests as _rq
-                    resp = _rq.get("https://api.coindesk.com/v1/bpi/currentprice/USD.json", timeout=5)
-                    if resp.status_code == 200:
-                        return float(resp.json()["bpi"]["USD"]["rate_float"])
-            except Exception:
-                pass
-            return None
-        
         # Parse the script content to extract strategy name
-        strategy_name = "Unknown Strategy"
-        for line in script_content.split('\n'):
-            if "strategy(" in line:
-                # Extract the strategy name from the strategy declaration
-                parts = line.split('"')
-                if len(parts) > 1:
-                    strategy_name = parts[1]
-                break
+        match = _STRATEGY_NAME_RE.search(script_content)
+        strategy_name = match.group(1) if match and match.group(1) is not None else "Unknown Strategy"
                 
         # Fetch a baseline current price (if available)
         current_price = _fetch_current_price(symbol) or 0
@@ -235,22 +461,174 @@ class PineScriptExecutor(BaseWidget):
         # This is not a real backtest, just a mock result for demonstration
         
         # Generate mock trades
-        import random
-        from datetime import datetime, timedelta
+        if use_cache:
+            cache_key = (
+                hashlib.blake2b(script_content.encode("utf-8"), digest_size=16).digest(),
+                symbol, timeframe, start_date, end_date or datetime.now().strftime("%Y-%m-%d"),
+                initial_capital, position_size, commission_percent, current_price, trades_format
+            )
+            cached = _SIMULATION_CACHE.get(cache_key)
+            if cached is not None:
+                return copy.deepcopy(cached)
         
-        random.seed(hash(script_content + symbol + timeframe))
+        # Private generator: concurrent runs must not share (or reseed) the module-level random state
+        seed = _simulation_seed(script_content, symbol, timeframe)
+        rng = random.Random(seed)
         
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        if end_date:
-            end = datetime.strptime(end_date, "%Y-%m-%d")
+        if np is not None:
+            trade_array, max_drawdown = self._simulate_trades_np(
+                seed, start_date, end_date, current_price, symbol,
+                initial_capital, position_size, commission_percent
+            )
+        else:
+            start = datetime.strptime(start_date, "%Y-%m-%d")
+            if end_date:
+                end = datetime.strptime(end_date, "%Y-%m-%d")
+            else:
+                end = datetime.now()
+            trades, max_drawdown = self._simulate_trades(
+                rng, start, end, current_price, symbol, initial_capital, position_size, commission_percent
+            )
+            
+        # Calculate performance metrics
+        if np is not None:
+            # Column reductions over the structured trade array
+            winning = trade_array["profit_percent"] > 0
+            profit_amount = trade_array["profit_amount"]
+            total_trades = int(trade_array.size)
+            winning_trades = int(winning.sum())
+            gross_profit = float(profit_amount[winning].sum())
+            gross_loss = abs(float(profit_amount[~winning].sum()))
+            net_profit = float(profit_amount.sum())
+            last_exit_price = float(trade_array["exit_price"][-1]) if total_trades else 0
+            # Straight from the array columns, without building per-trade dicts the layout doesn't need
+            trades = _trade_columns(trade_array) if trades_format == "columns" else _trade_records(trade_array)
+        else:
+            # One pass over the trades for every count and sum
+            total_trades = len(trades)
+            winning_trades = 0
+            gross_profit = losing_sum = net_profit = 0
+            for t in trades:
+                amount = t["profit_amount"]
+                net_profit += amount
+                if t["profit_percent"] > 0:
+                    winning_trades += 1
+                    gross_profit += amount
+                else:
+                    losing_sum += amount
+            gross_loss = abs(losing_sum)
+            last_exit_price = trades[-1]["exit_price"] if trades else 0
+        losing_trades = total_trades - winning_trades
+        
+        win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+        
+        profit_factor = gross_profit / gross_loss if gross_loss > 0 else float('inf')
+        
+        net_profit_percent = (net_profit / initial_capital) * 100
+        
+        # Determine last price for current market snapshot. Use fetched current_price if available.
+        last_price = round(current_price if current_price else last_exit_price, 2)
+
+        # Mark price unavailability flag (for UI display) if we still don't have a price > 0
+        price_unavailable = last_price == 0
+
+        # Trades are generated in entry-date order, so the curves can walk them as they are
+        if np is not None:
+            # Equity and drawdown curves as prefix sums / prefix maxima over the whole run
+            equity = np.cumsum(np.concatenate(([initial_capital], profit_amount)))
+            equity_pct = np.round(equity / initial_capital * 100, 2)
+            high_watermark = np.maximum.accumulate(np.maximum(equity_pct, 100))
+            drawdown = (high_watermark - equity_pct) / high_watermark * 100
+            
+            # x is the trade number, 0 being the starting equity; charts label the axis themselves
+            equity_curve = {"x": list(range(total_trades + 1)), "y": equity_pct.tolist()}
+            drawdown_curve = {"x": equity_curve["x"], "y": np.round(-drawdown, 2).tolist()}  # negative to show drawdown going down
         else:
-            end = datetime.now()
+            # Equity and drawdown curves in one walk over the trades (x is the trade number, 0 being the starting equity)
+            equity_y = [100]  # Start at 100%
+            drawdown_y = [-0.0]  # negative to show drawdown going down
+            current_equity = initial_capital
+            high_watermark = 100
+            for trade in trades:
+                current_equity += trade["profit_amount"]
+                equity_pct = round((current_equity / initial_capital) * 100, 2)
+                if equity_pct > high_watermark:
+                    high_watermark = equity_pct
+                equity_y.append(equity_pct)
+                drawdown_y.append(round(-((high_watermark - equity_pct) / high_watermark * 100), 2))
+            equity_curve = {"x": list(range(len(trades) + 1)), "y": equity_y}
+            drawdown_curve = {"x": equity_curve["x"], "y": drawdown_y}
             
+        # Generate monthly returns
+        if np is not None:
+            # Group profits by entry month with one scatter-add over the month index of each trade
+            months, month_index = np.unique(trade_array["entry_date"].astype("datetime64[M]"), return_inverse=True)
+            month_profit = np.zeros(months.size)
+            np.add.at(month_profit, month_index, profit_amount)
+            monthly_returns = {
+                "x": months.astype(str).tolist(),  # YYYY-MM format
+                "y": np.round(month_profit / initial_capital * 100, 2).tolist()
+            }
+        else:
+            monthly_returns = {"x": [], "y": []}
+            months = defaultdict(float)
+            
+            for trade in trades:
+                months[trade["entry_date"][:7]] += trade["profit_amount"]  # YYYY-MM format
+                
+            for month, profit in sorted(months.items()):
+                monthly_returns["x"].append(month)
+                monthly_returns["y"].append(round((profit / initial_capital) * 100, 2))
+                
+            if trades_format == "columns":
+                trades = {field: [t[field] for t in trades] for field in _TRADE_FIELDS}
+            
+        # Return the simulated backtest results
+        results = {
+            "strategy_name": strategy_name,
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "start_date": start_date,
+            "end_date": end_date if end_date else datetime.now().strftime("%Y-%m-%d"),
+            "initial_capital": initial_capital,
+            "position_size": position_size,
+            "commission_percent": commission_percent,
+            "total_trades": total_trades,
+            "winning_trades": winning_trades,
+            "losing_trades": losing_trades,
+            "win_rate": round(win_rate, 2),
+            "profit_factor": round(profit_factor, 2),
+            "net_profit": round(net_profit, 2),
+            "net_profit_percent": round(net_profit_percent, 2),
+            "max_drawdown_percent": round(max_drawdown, 2),
+            "sharpe_ratio": round(rng.uniform(0.8, 2.5), 2),  # Mock sharpe ratio
+            "trades": trades,
+            "chart_data": {
+                "equity_curve": equity_curve,
+                "drawdown_curve": drawdown_curve,
+                "monthly_returns": monthly_returns
+            },
+            "execution_mode": "simulation",
+            "last_price": round(last_price, 2),
+            "price_unavailable": price_unavailable
+        }
+        if use_cache:
+            if len(_SIMULATION_CACHE) >= _SIMULATION_CACHE_MAX:
+                _SIMULATION_CACHE.pop(next(iter(_SIMULATION_CACHE)))
+            # Keep a private copy so callers can mutate what they get back
+            _SIMULATION_CACHE[cache_key] = copy.deepcopy(results)
+        return results
+
+    def _simulate_trades(self, rng, start, end, current_price, symbol, initial_capital, position_size, commission_percent):
+        """
+        Generate mock trades day by day, drawing from the seeded random.Random rng.
+        Returns the list of trades and the maximum drawdown in percent.
+        """
         # Generate dates for trades
         dates = []
         current = start
         while current < end:
-            if random.random() < 0.1:  # 10% chance of a trade on any day
+            if rng.random() < 0.1:  # 10% chance of a trade on any day
                 dates.append(current)
             current += timedelta(days=1)
             
@@ -262,11 +640,11 @@ class PineScriptExecutor(BaseWidget):
         
         for i, date in enumerate(dates):
             # Decide if long or short
-            side = "Long" if random.random() < 0.6 else "Short"
+            side = "Long" if rng.random() < 0.6 else "Short"
             
             # Generate entry and exit dates
             entry_date = date
-            hold_days = random.randint(1, 10)
+            hold_days = rng.randint(1, 10)
             exit_date = entry_date + timedelta(days=hold_days)
             
             if exit_date > end:
@@ -279,19 +657,16 @@ class PineScriptExecutor(BaseWidget):
             if base_price == 0:
                 # Fallback: previous mock range (1k-2k) adjusted to larger range for BTC
                 if symbol.lower().startswith("btc"):
-                    base_price = 20000 + random.random() * 40000  # 20k-60k
+                    base_price = 20000 + rng.random() * 40000  # 20k-60k
                 else:
-                    base_price = 1000 + random.random() * 1000
-            price_change = (random.random() - 0.3) * 10  # -3% to +7% change
+                    base_price = 1000 + rng.random() * 1000
+            price_change = (rng.random() - 0.3) * 10  # -3% to +7% change
             
-            if side == "Long":
-                entry_price = base_price
-                exit_price = base_price * (1 + price_change / 100)
-                profit_percent = price_change - commission_percent
-            else:  # Short
-                entry_price = base_price
-                exit_price = base_price * (1 + price_change / 100)
-                profit_percent = -price_change - commission_percent
+            # Shorts profit from the opposite move; prices are the same either way
+            sign = 1 if side == "Long" else -1
+            entry_price = base_price
+            exit_price = base_price * (1 + price_change / 100)
+            profit_percent = sign * price_change - commission_percent
                 
             # Calculate profit
             trade_size = equity * position_size / 100
@@ -318,92 +693,67 @@ class PineScriptExecutor(BaseWidget):
                 "profit_amount": round(profit_amount, 2)
             })
             
-        # Calculate performance metrics
-        total_trades = len(trades)
-        winning_trades = sum(1 for t in trades if t["profit_percent"] > 0)
-        losing_trades = total_trades - winning_trades
+        return trades, max_drawdown
         
-        win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-        
-        gross_profit = sum(t["profit_amount"] for t in trades if t["profit_percent"] > 0)
-        gross_loss = abs(sum(t["profit_amount"] for t in trades if t["profit_percent"] <= 0))
+    def _simulate_trades_np(self, seed, start_date, end_date, current_price, symbol, initial_capital, position_size, commission_percent):
+        """
+        Vectorized counterpart of _simulate_trades: every random draw is made as one array
+        and equity compounds through a cumulative product instead of a per-trade loop.
+        Returns the trades as a _TRADE_DTYPE structured array and the maximum drawdown in percent.
+        """
+        rng = np.random.default_rng(seed)
         
-        profit_factor = gross_profit / gross_loss if gross_loss > 0 else float('inf')
+        # Days from start up to (excluding) the end date, or up to and including today when open-ended,
+        # each with a 10% chance of a trade
+        start_day = np.datetime64(start_date, "D")
+        if end_date:
+            last_day = np.datetime64(end_date, "D")
+            days = np.arange(start_day, last_day, dtype="datetime64[D]")
+        else:
+            last_day = np.datetime64(datetime.now().date(), "D")
+            days = np.arange(start_day, last_day + 1, dtype="datetime64[D]")
+        entry_dates = days[rng.random(days.size) < 0.1]
+        n = entry_dates.size
         
-        net_profit = sum(t["profit_amount"] for t in trades)
-        net_profit_percent = (net_profit / initial_capital) * 100
+        is_long = rng.random(n) < 0.6
+        hold_days = rng.integers(1, 11, size=n)
+        if current_price:
+            base_price = np.full(n, float(current_price))
+        elif symbol.lower().startswith("btc"):
+            base_price = 20000 + rng.random(n) * 40000  # 20k-60k
+        else:
+            base_price = 1000 + rng.random(n) * 1000
+        price_change = (rng.random(n) - 0.3) * 10  # -3% to +7% change
         
-        # Determine last price for current market snapshot. Use fetched current_price if available.
-        last_price = round(current_price if current_price else trades[-1]["exit_price"] if trades else base_price, 2)
-
-        # Mark price unavailability flag (for UI display) if we still don't have a price > 0
-        price_unavailable = last_price == 0
-
-        # Generate chart data for equity curve
-        equity_curve = {"x": [], "y": []}
-        current_equity = initial_capital
-        equity_curve["x"].append("Day 0")
-        equity_curve["y"].append(100)  # Start at 100%
+        exit_price = base_price * (1 + price_change / 100)
+        profit_percent = np.where(is_long, price_change, -price_change) - commission_percent
         
-        sorted_trades = sorted(trades, key=lambda t: t["entry_date"])
-        for i, trade in enumerate(sorted_trades):
-            current_equity += trade["profit_amount"]
-            equity_pct = (current_equity / initial_capital) * 100
-            equity_curve["x"].append(f"Trade {i+1}")
-            equity_curve["y"].append(round(equity_pct, 2))
-            
-        # Generate drawdown curve
-        drawdown_curve = {"x": equity_curve["x"], "y": []}
-        high_watermark = 100
-        for equity_pct in equity_curve["y"]:
-            if equity_pct > high_watermark:
-                high_watermark = equity_pct
-            drawdown = (high_watermark - equity_pct) / high_watermark * 100
-            drawdown_curve["y"].append(round(-drawdown, 2))  # negative to show drawdown going down
+        if njit is not None:
+            profit_amount, max_drawdown = _equity_path(profit_percent, float(position_size), float(initial_capital))
+        else:
+            # Each trade risks position_size% of the equity left by the previous one
+            equity = initial_capital * np.cumprod(1 + profit_percent * position_size / 10000)
+            equity_before = np.concatenate(([initial_capital], equity[:-1]))
+            profit_amount = equity_before * position_size / 100 * profit_percent / 100
             
-        # Generate monthly returns
-        monthly_returns = {"x": [], "y": []}
-        months = {}
+            high_watermark = np.maximum.accumulate(np.maximum(equity, initial_capital))
+            max_drawdown = float(((high_watermark - equity) / high_watermark * 100).max()) if n else 0
         
-        for trade in trades:
-            entry_month = trade["entry_date"][:7]  # YYYY-MM format
-            if entry_month not in months:
-                months[entry_month] = 0
-            months[entry_month] += trade["profit_amount"]
-            
-        for month, profit in sorted(months.items()):
-            monthly_returns["x"].append(month)
-            monthly_returns["y"].append(round((profit / initial_capital) * 100, 2))
-            
-        # Return the simulated backtest results
-        return {
-            "strategy_name": strategy_name,
-            "symbol": symbol,
-            "timeframe": timeframe,
-            "start_date": start_date,
-            "end_date": end_date if end_date else datetime.now().strftime("%Y-%m-%d"),
-            "initial_capital": initial_capital,
-            "position_size": position_size,
-            "commission_percent": commission_percent,
-            "total_trades": total_trades,
-            "winning_trades": winning_trades,
-            "losing_trades": losing_trades,
-            "win_rate": round(win_rate, 2),
-            "profit_factor": round(profit_factor, 2),
-            "net_profit": round(net_profit, 2),
-            "net_profit_percent": round(net_profit_percent, 2),
-            "max_drawdown_percent": round(max_drawdown, 2),
-            "sharpe_ratio": round(random.uniform(0.8, 2.5), 2),  # Mock sharpe ratio
-            "trades": trades,
-            "chart_data": {
-                "equity_curve": equity_curve,
-                "drawdown_curve": drawdown_curve,
-                "monthly_returns": monthly_returns
-            },
-            "execution_mode": "simulation",
-            "last_price": round(last_price, 2),
-            "price_unavailable": price_unavailable
-        }
+        exit_dates = np.minimum(entry_dates + hold_days, last_day)
+        
+        trade_array = np.empty(n, dtype=_TRADE_DTYPE)
+        trade_array["id"] = np.arange(1, n + 1)
+        trade_array["entry_date"] = entry_dates
+        trade_array["exit_date"] = exit_dates
+        trade_array["side"] = is_long
+        trade_array["entry_price"] = base_price
+        trade_array["exit_price"] = exit_price
+        trade_array["profit_percent"] = profit_percent
+        trade_array["profit_amount"] = profit_amount
+        # Round whole columns at once, as the reported values are cents / hundredths of a percent
+        for field in ("entry_price", "exit_price", "profit_percent", "profit_amount"):
+            trade_array[field] = np.round(trade_array[field], 2)
+        return trade_array, max_drawdown
 
 if __name__ == "__main__":
     import time
@@ -1,9 +1,31 @@
 import os
+import re
+import copy
 import json
+import stat
+import uuid
+import shutil
 import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
 from typing import Dict, Any, List
 from pydantic import Field
-import base64
+
+try:
+    import orjson  # optional fast JSON backend
+except ImportError:
+    orjson = None
+
+try:
+    import fcntl  # POSIX advisory file locks
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt  # Windows file locks, used where fcntl is missing
+except ImportError:
+    msvcrt = None
 
 from proconfig.widgets.base import WIDGETS, BaseWidget
 
@@ -31,6 +53,189 @@ def Input(*args, **kwargs):
 def Output(*args, **kwargs):
     return Input(*args, **kwargs)
 
+
+def _loads(data):
+    """Parse JSON from str or a bytes-like object, preferring orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = bytes(data)
+    return json.loads(data)
+
+
+# config_content values that hold serialized JSON rather than an already parsed object
+_JSON_TYPES = (str, bytes, bytearray, memoryview)
+
+
+def _dumps(obj):
+    """Serialize obj to one newline-terminated line of UTF-8 JSON bytes, preferring orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode('utf-8')
+
+
+def _read_file(path):
+    """Read the whole file at path in one go; returns (stat result, bytes)."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        st = os.fstat(fd)
+        data = os.read(fd, st.st_size)
+        while len(data) < st.st_size:
+            chunk = os.read(fd, st.st_size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return st, data
+    finally:
+        os.close(fd)
+
+
+# The process umask, read once at import since reading it means setting it
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+
+def _replace_file(path, data):
+    """Atomically replace the file at path with data, keeping its permissions if it already exists."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix="." + os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            # Make the new contents durable before they replace the old file
+            os.fsync(f.fileno())
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            # mkstemp makes the file owner-only; a new file gets the mode open() would give it
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _read_text(path):
+    """Read a UTF-8 text file with universal newlines, as open(path, 'r') would."""
+    text = _read_file(path)[1].decode('utf-8')
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+# Text after the first "///" on the first line that has one, up to any further "///"
+_DESCRIPTION_RE = re.compile(r'///(.*?)(?:///|$)', re.M)
+
+
+def _description(script):
+    """Extract the strategy description from a Pine script's first /// comment."""
+    match = _DESCRIPTION_RE.search(script)
+    return match.group(1).strip() if match else "No description"
+
+
+def _error_response(message):
+    """Build the widget's error output."""
+    return {
+        "status": "error",
+        "message": message,
+        "strategies": [],
+        "selected_strategy": {}
+    }
+
+
+# Strategy fields stored in per-strategy files rather than in the library file
+_PAYLOAD_FIELDS = frozenset(("script", "config"))
+
+# temp directory -> library file path inside it, whose directory has been created
+_LIBRARY_PATHS = {}
+
+# library path -> (st_mtime_ns, st_size, strategies, by_id, by_name, line count) as of the last load or save
+_LIBRARY_CACHE = {}
+
+# Lock files the current thread holds, so a nested _locked() does not wait on itself
+_HELD_LOCKS = threading.local()
+
+# library path -> (_LIBRARY_CACHE entry, list projection built from it)
+_LISTINGS = {}
+
+
+def _replay(data):
+    """Rebuild the strategy list from JSONL library bytes; returns (strategies, line count).
+
+    Each line holds a strategy record (without its script and config) or a {"id": ..., "_deleted": true} tombstone,
+    and the last line for an id wins.
+    """
+    records = {}
+    lines = 0
+    for line in data.split(b"\n"):
+        if not line.strip():
+            continue
+        lines += 1
+        try:
+            record = _loads(line)
+        except ValueError:
+            # A line torn by a crash mid-append (possibly inside a multi-byte character); the rest of the library is still good
+            continue
+        if not isinstance(record, dict):
+            continue
+        if record.get("_deleted"):
+            records.pop(record.get("id"), None)
+        else:
+            records[record.get("id")] = record
+    return list(records.values()), lines
+
+
+def _index(strategies):
+    """Map each strategy id and name to its position in strategies; returns (by_id, by_name), the first of any duplicates winning."""
+    by_id, by_name = {}, {}
+    for i, strategy in enumerate(strategies):
+        by_id.setdefault(strategy.get("id"), i)
+        by_name.setdefault(strategy.get("name"), i)
+    return by_id, by_name
+
+
+def _apply(strategies, by_id, by_name, record):
+    """Apply one library record (a strategy or a deletion tombstone) to a loaded library and its index.
+
+    Returns the new (strategies, by_id, by_name). The arguments may be the cached library, which list and get
+    read without the lock, so changes go into copies.
+    """
+    i = by_id.get(record.get("id"))
+    if record.get("_deleted"):
+        if i is not None:
+            by_id, by_name = dict(by_id), dict(by_name)
+            del by_id[record.get("id")]
+            name = strategies[i].get("name")
+            strategies = strategies[:i] + strategies[i + 1:]
+            if by_name.get(name) == i:
+                del by_name[name]
+            # Everything after the removed strategy moved up one place; the next
+            # strategy sharing its name, if any, now comes first
+            for j in range(i, len(strategies)):
+                strategy = strategies[j]
+                if by_id.get(strategy.get("id")) == j + 1:
+                    by_id[strategy.get("id")] = j
+                if by_name.get(strategy.get("name")) == j + 1:
+                    by_name[strategy.get("name")] = j
+                else:
+                    by_name.setdefault(strategy.get("name"), j)
+    elif i is None:
+        # New strategies go last, so one only takes its name if no earlier strategy has it
+        by_id = dict(by_id)
+        by_id[record.get("id")] = len(strategies)
+        if record.get("name") not in by_name:
+            by_name = dict(by_name)
+            by_name[record.get("name")] = len(strategies)
+        strategies = strategies + [record]
+    else:
+        renamed = strategies[i].get("name") != record.get("name")
+        strategies = list(strategies)
+        strategies[i] = record
+        if renamed:
+            by_id, by_name = _index(strategies)
+    return strategies, by_id, by_name
+
 # ------------------------------------------------------------------------------
 
 @WIDGETS.register_module()
@@ -54,191 +259,304 @@ class StrategyLibrary(BaseWidget):
         strategies: List[Dict[str, Any]] = Output([], description="List of strategies", type="array", items={"type": "object"})
         selected_strategy: Dict[str, Any] = Output({}, description="Selected strategy full detail", type="object")
         
+    # action name -> handler taking (widget, config)
+    ACTIONS = {
+        "list": lambda self, config: self._list_strategies(),
+        "get": lambda self, config: self._get_strategy(config.strategy_id, config.strategy_name),
+        "add": lambda self, config: self._add_strategy(config.strategy_name, config.script_path, 
+                                                      config.script_content, config.config_path, 
+                                                      config.config_content, config.tags),
+        "update": lambda self, config: self._update_strategy(config.strategy_id, config.strategy_name, 
+                                                            config.script_path, config.script_content, 
+                                                            config.config_path, config.config_content, 
+                                                            config.tags),
+        "delete": lambda self, config: self._delete_strategy(config.strategy_id),
+    }
+        
     def execute(self, environ, config):
         try:
             action = config.action.lower()
             
-            if action == "list":
-                return self._list_strategies()
-            elif action == "get":
-                return self._get_strategy(config.strategy_id, config.strategy_name)
-            elif action == "add":
-                return self._add_strategy(config.strategy_name, config.script_path, 
-                                        config.script_content, config.config_path, 
-                                        config.config_content, config.tags)
-            elif action == "update":
-                return self._update_strategy(config.strategy_id, config.strategy_name, 
-                                           config.script_path, config.script_content, 
-                                           config.config_path, config.config_content, 
-                                           config.tags)
-            elif action == "delete":
-                return self._delete_strategy(config.strategy_id)
-            else:
-                return {
-                    "status": "error",
-                    "message": f"Unknown action: {action}",
-                    "strategies": [],
-                    "selected_strategy": {}
-                }
+            handler = self.ACTIONS.get(action)
+            if handler is None:
+                return _error_response(f"Unknown action: {action}")
+            return handler(self, config)
                 
         except Exception as e:
-            return {
-                "status": "error",
-                "message": f"Failed to execute: {str(e)}",
-                "strategies": [],
-                "selected_strategy": {}
-            }
+            return _error_response(f"Failed to execute: {str(e)}")
             
     def _get_library_path(self):
         """Get the path to the strategy library file"""
-        # Create directory if it doesn't exist
-        library_dir = os.path.join(tempfile.gettempdir(), "trading_bot")
-        if not os.path.exists(library_dir):
-            os.makedirs(library_dir)
+        library_path = _LIBRARY_PATHS.get(tempfile.gettempdir())
+        if library_path is None:
+            # Create directory if it doesn't exist
+            library_dir = os.path.join(tempfile.gettempdir(), "trading_bot")
+            os.makedirs(library_dir, exist_ok=True)
+            library_path = _LIBRARY_PATHS[tempfile.gettempdir()] = os.path.join(library_dir, "strategy_library.jsonl")
             
-        return os.path.join(library_dir, "strategy_library.json")
+        return library_path
+        
+    @contextmanager
+    def _locked(self):
+        """Hold an exclusive lock on the library across a load-modify-save; re-entrant within a thread"""
+        lock_path = self._get_library_path() + ".lock"
+        held = _HELD_LOCKS.__dict__.setdefault("paths", set())
+        if lock_path in held:
+            yield
+            return
+            
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+        except FileNotFoundError:
+            # The directory was removed since its path was cached, e.g. by a temp cleaner
+            _LIBRARY_PATHS.pop(tempfile.gettempdir(), None)
+            fd = os.open(self._get_library_path() + ".lock", os.O_CREAT | os.O_RDWR, 0o644)
+            
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            elif msvcrt is not None:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            held.add(lock_path)
+            try:
+                yield
+            finally:
+                held.discard(lock_path)
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                elif msvcrt is not None:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
         
     def _load_library(self):
-        """Load the strategy library from file"""
+        """Load the strategy library as (strategies, by_id, by_name), reusing the parse of an unchanged file"""
         library_path = self._get_library_path()
         
-        if not os.path.exists(library_path):
+        try:
+            st = os.stat(library_path)
+        except FileNotFoundError:
+            _LIBRARY_CACHE.pop(library_path, None)
+            if self._migrate_library(library_path):
+                return self._load_library()
             # Create an empty library
-            return []
+            return [], {}, {}
             
-        try:
-            with open(library_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            # If the file is corrupted, return an empty library
-            return []
-            
-    def _save_library(self, strategies):
-        """Save the strategy library to file"""
+        cached = _LIBRARY_CACHE.get(library_path)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2:5]
+            
+        st, data = _read_file(library_path)
+        strategies, lines = _replay(data)
+        
+        by_id, by_name = _index(strategies)
+        _LIBRARY_CACHE[library_path] = (st.st_mtime_ns, st.st_size, strategies, by_id, by_name, lines)
+        return strategies, by_id, by_name
+        
+    def _migrate_library(self, library_path):
+        """Convert a library left in the old single-array JSON file to JSONL; returns whether there was one"""
+        legacy_path = os.path.splitext(library_path)[0] + ".json"
+        if not os.path.exists(legacy_path):
+            return False
+            
+        # Replacing the library file must not race a locked append or another migration
+        with self._locked():
+            if os.path.exists(library_path):
+                # Someone else migrated it while we waited for the lock
+                return True
+            try:
+                data = _read_file(legacy_path)[1]
+            except FileNotFoundError:
+                return False
+                
+            try:
+                strategies = _loads(data)
+            except ValueError:
+                # If the file is corrupted, start from an empty library
+                strategies = []
+            self._compact([self._write_payload(strategy) for strategy in strategies])
+            try:
+                os.remove(legacy_path)
+            except FileNotFoundError:
+                pass
+        return True
+            
+    def _save_library(self, record):
+        """Append record (a strategy or a deletion tombstone) to the library file and the cached library"""
         library_path = self._get_library_path()
+        cached = _LIBRARY_CACHE.pop(library_path, None)
         
-        with open(library_path, 'w', encoding='utf-8') as f:
-            json.dump(strategies, f, ensure_ascii=False, indent=2)
+        with open(library_path, 'a+b') as f:
+            st = os.fstat(f.fileno())
+            line = _dumps(record)
+            if st.st_size:
+                # Start a fresh line if a crash left the last one unterminated
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+            
+        # Only update the cached library if nobody else touched the file since it was loaded
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            strategies, by_id, by_name, lines = cached[2:]
+        elif st.st_size == 0:
+            strategies, by_id, by_name, lines = [], {}, {}, 0
+        else:
+            return
+        strategies, by_id, by_name = _apply(strategies, by_id, by_name, record)
+        lines += 1
+            
+        if lines - len(strategies) > len(strategies):
+            # Mostly superseded records and tombstones: rewrite just the live ones
+            self._compact(strategies)
+            return
+            
+        st = os.stat(library_path)
+        _LIBRARY_CACHE[library_path] = (st.st_mtime_ns, st.st_size, strategies, by_id, by_name, lines)
+        
+    def _compact(self, strategies):
+        """Atomically replace the library file with one line per live strategy"""
+        library_path = self._get_library_path()
+        _replace_file(library_path, b"".join(_dumps(strategy) for strategy in strategies))
+        
+        by_id, by_name = _index(strategies)
+        st = os.stat(library_path)
+        _LIBRARY_CACHE[library_path] = (st.st_mtime_ns, st.st_size, strategies, by_id, by_name, len(strategies))
+        
+    def _payload_dir(self, strategy_id):
+        """Get the directory holding a strategy's script and config"""
+        return os.path.join(os.path.dirname(self._get_library_path()), "strategies", strategy_id)
+        
+    def _write_payload(self, strategy):
+        """Write a strategy's script and config to its payload directory; returns the rest, for the library file"""
+        payload_dir = self._payload_dir(strategy["id"])
+        os.makedirs(payload_dir, exist_ok=True)
+        _replace_file(os.path.join(payload_dir, "script.pine"), strategy["script"].encode('utf-8'))
+        _replace_file(os.path.join(payload_dir, "config.json"), _dumps(strategy["config"]))
+        record = {key: value for key, value in strategy.items() if key not in _PAYLOAD_FIELDS}
+        # The record goes into the cache; don't share its tags with the caller's strategy
+        if isinstance(record.get("tags"), list):
+            record["tags"] = list(record["tags"])
+        return record
+        
+    def _read_payload(self, record):
+        """Get the full strategy for a library record, reading its script and config from disk"""
+        if "script" in record:
+            # Written before scripts and configs moved out of the library file
+            return copy.deepcopy(record)
+            
+        payload_dir = self._payload_dir(record["id"])
+        payload = {
+            "script": _read_file(os.path.join(payload_dir, "script.pine"))[1].decode('utf-8'),
+            "config": _loads(_read_file(os.path.join(payload_dir, "config.json"))[1]),
+        }
+        # Keep the original field order: script and config follow the description
+        strategy = {}
+        for key, value in record.items():
+            strategy[key] = value
+            if key == "description":
+                strategy.update(payload)
+        strategy.update(payload)
+        # The record is the cached one; don't let callers mutate its tags through the result
+        if isinstance(strategy.get("tags"), list):
+            strategy["tags"] = list(strategy["tags"])
+        return strategy
             
     def _list_strategies(self):
         """List all strategies in the library"""
-        strategies = self._load_library()
+        strategies = self._load_library()[0]
         
-        # Filter out sensitive information
-        simplified_strategies = []
-        for strategy in strategies:
-            simplified_strategies.append({
-                "id": strategy.get("id", ""),
-                "name": strategy.get("name", ""),
-                "description": strategy.get("description", ""),
-                "tags": strategy.get("tags", []),
-                "created_at": strategy.get("created_at", ""),
-                "updated_at": strategy.get("updated_at", "")
-            })
+        # Reuse the projection while the cached library is unchanged; every change swaps in a new entry.
+        # A change may land between the load and this lookup, so only tie a projection to the entry it came from.
+        library_path = self._get_library_path()
+        cached = _LIBRARY_CACHE.get(library_path)
+        if cached is not None and cached[2] is not strategies:
+            cached = None
+        listing = _LISTINGS.get(library_path)
+        if cached is None or listing is None or listing[0] is not cached:
+            # Filter out sensitive information
+            simplified_strategies = []
+            for strategy in strategies:
+                simplified_strategies.append({
+                    "id": strategy.get("id", ""),
+                    "name": strategy.get("name", ""),
+                    "description": strategy.get("description", ""),
+                    "tags": strategy.get("tags", []),
+                    "created_at": strategy.get("created_at", ""),
+                    "updated_at": strategy.get("updated_at", "")
+                })
+            listing = (cached, simplified_strategies)
+            if cached is not None:
+                _LISTINGS[library_path] = listing
             
         return {
             "status": "success",
             "message": f"Found {len(strategies)} strategies",
-            "strategies": simplified_strategies,
+            # Fresh dicts and tags lists, so a caller mutating the output cannot reach the cache
+            "strategies": [dict(strategy, tags=list(strategy["tags"])) for strategy in listing[1]],
             "selected_strategy": {}
         }
         
     def _get_strategy(self, strategy_id, strategy_name=None):
         """Get a specific strategy from the library"""
-        strategies = self._load_library()
+        strategies, by_id, by_name = self._load_library()
         
-        # Find by ID
-        if strategy_id:
-            for strategy in strategies:
-                if strategy.get("id") == strategy_id:
-                    return {
-                        "status": "success",
-                        "message": f"Found strategy: {strategy.get('name')}",
-                        "strategies": [],
-                        "selected_strategy": strategy
-                    }
-                    
-        # Find by name if no ID provided
-        elif strategy_name:
-            for strategy in strategies:
-                if strategy.get("name") == strategy_name:
-                    return {
-                        "status": "success",
-                        "message": f"Found strategy: {strategy.get('name')}",
-                        "strategies": [],
-                        "selected_strategy": strategy
-                    }
+        # Find by ID, or by name if no ID provided
+        i = by_id.get(strategy_id) if strategy_id else by_name.get(strategy_name) if strategy_name else None
+        if i is not None:
+            try:
+                strategy = self._read_payload(strategies[i])
+            except FileNotFoundError:
+                # Deleted since the library was loaded: delete removes the script and config right after its tombstone
+                strategy = None
+        if i is not None and strategy is not None:
+            return {
+                "status": "success",
+                "message": f"Found strategy: {strategy.get('name')}",
+                "strategies": [],
+                "selected_strategy": strategy
+            }
                     
         # Not found
-        return {
-            "status": "error",
-            "message": f"Strategy not found with ID: {strategy_id or 'None'} or name: {strategy_name or 'None'}",
-            "strategies": [],
-            "selected_strategy": {}
-        }
+        return _error_response(f"Strategy not found with ID: {strategy_id or 'None'} or name: {strategy_name or 'None'}")
         
     def _add_strategy(self, strategy_name, script_path=None, script_content=None, 
                     config_path=None, config_content=None, tags=None):
         """Add a new strategy to the library"""
         if not strategy_name:
-            return {
-                "status": "error",
-                "message": "Strategy name is required",
-                "strategies": [],
-                "selected_strategy": {}
-            }
+            return _error_response("Strategy name is required")
             
         # Load the script content
         if script_content:
             script_data = script_content
         elif script_path and os.path.isfile(script_path):
-            with open(script_path, 'r', encoding='utf-8') as f:
-                script_data = f.read()
+            script_data = _read_text(script_path)
         else:
-            return {
-                "status": "error",
-                "message": "Either script_path or script_content is required",
-                "strategies": [],
-                "selected_strategy": {}
-            }
+            return _error_response("Either script_path or script_content is required")
             
         # Load the config content
         config_data = {}
         if config_content:
             try:
-                if isinstance(config_content, str):
-                    config_data = json.loads(config_content)
+                # JSON text, or UTF-8 bytes an upstream step already serialized
+                if isinstance(config_content, _JSON_TYPES):
+                    config_data = _loads(config_content)
                 else:
                     config_data = config_content
-            except json.JSONDecodeError:
-                return {
-                    "status": "error",
-                    "message": "Invalid JSON configuration content",
-                    "strategies": [],
-                    "selected_strategy": {}
-                }
+            except ValueError:
+                # Malformed JSON or, for bytes, malformed UTF-8
+                return _error_response("Invalid JSON configuration content")
         elif config_path and os.path.isfile(config_path):
             try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    config_data = json.load(f)
+                config_data = _loads(_read_file(config_path)[1])
             except Exception as e:
-                return {
-                    "status": "error",
-                    "message": f"Failed to load configuration: {str(e)}",
-                    "strategies": [],
-                    "selected_strategy": {}
-                }
+                return _error_response(f"Failed to load configuration: {str(e)}")
                 
         # Extract strategy description from script
-        description = "No description"
-        for line in script_data.split('\n'):
-            if "///" in line:
-                description = line.split("///")[1].strip()
-                break
+        description = _description(script_data)
                 
         # Generate a unique ID
-        from datetime import datetime
-        import uuid
         strategy_id = str(uuid.uuid4())
         timestamp = datetime.now().isoformat()
         
@@ -255,20 +573,14 @@ class StrategyLibrary(BaseWidget):
         }
         
         # Add to library
-        strategies = self._load_library()
-        
-        # Check for duplicate name
-        for strategy in strategies:
-            if strategy.get("name") == strategy_name:
-                return {
-                    "status": "error",
-                    "message": f"Strategy with name '{strategy_name}' already exists",
-                    "strategies": [],
-                    "selected_strategy": {}
-                }
+        with self._locked():
+            by_name = self._load_library()[2]
+            
+            # Check for duplicate name
+            if strategy_name in by_name:
+                return _error_response(f"Strategy with name '{strategy_name}' already exists")
                 
-        strategies.append(new_strategy)
-        self._save_library(strategies)
+            self._save_library(self._write_payload(new_strategy))
         
         return {
             "status": "success",
@@ -282,120 +594,81 @@ class StrategyLibrary(BaseWidget):
                        tags=None):
         """Update an existing strategy in the library"""
         if not strategy_id:
-            return {
-                "status": "error",
-                "message": "Strategy ID is required for update",
-                "strategies": [],
-                "selected_strategy": {}
-            }
+            return _error_response("Strategy ID is required for update")
             
-        # Load the library
-        strategies = self._load_library()
-        
-        # Find the strategy to update
-        for i, strategy in enumerate(strategies):
-            if strategy.get("id") == strategy_id:
-                # Update fields if provided
-                if strategy_name:
-                    strategy["name"] = strategy_name
-                    
-                # Update script if provided
-                if script_content:
-                    strategy["script"] = script_content
-                elif script_path and os.path.isfile(script_path):
-                    with open(script_path, 'r', encoding='utf-8') as f:
-                        strategy["script"] = f.read()
-                        
-                # Update config if provided
-                if config_content:
-                    try:
-                        if isinstance(config_content, str):
-                            strategy["config"] = json.loads(config_content)
-                        else:
-                            strategy["config"] = config_content
-                    except json.JSONDecodeError:
-                        return {
-                            "status": "error",
-                            "message": "Invalid JSON configuration content",
-                            "strategies": [],
-                            "selected_strategy": {}
-                        }
-                elif config_path and os.path.isfile(config_path):
-                    try:
-                        with open(config_path, 'r', encoding='utf-8') as f:
-                            strategy["config"] = json.load(f)
-                    except Exception as e:
-                        return {
-                            "status": "error",
-                            "message": f"Failed to load configuration: {str(e)}",
-                            "strategies": [],
-                            "selected_strategy": {}
-                        }
-                        
-                # Update tags if provided
-                if tags:
-                    strategy["tags"] = tags
-                    
-                # Update description if script was updated
-                if script_content or (script_path and os.path.isfile(script_path)):
-                    description = "No description"
-                    for line in strategy["script"].split('\n'):
-                        if "///" in line:
-                            description = line.split("///")[1].strip()
-                            break
-                    strategy["description"] = description
-                    
-                # Update timestamp
-                from datetime import datetime
-                strategy["updated_at"] = datetime.now().isoformat()
-                
-                # Save the library
-                strategies[i] = strategy
-                self._save_library(strategies)
+        with self._locked():
+            # Load the library
+            strategies, by_id = self._load_library()[:2]
+            
+            # Find the strategy to update
+            i = by_id.get(strategy_id)
+            if i is None:
+                return _error_response(f"Strategy not found with ID: {strategy_id}")
+            
+            # Edit a copy so a failed update leaves the cached library untouched
+            strategy = self._read_payload(strategies[i])
+            
+            # Update fields if provided
+            if strategy_name:
+                strategy["name"] = strategy_name
+            
+            # Update script if provided
+            if script_content:
+                strategy["script"] = script_content
+            elif script_path and os.path.isfile(script_path):
+                strategy["script"] = _read_text(script_path)
                 
-                return {
-                    "status": "success",
-                    "message": f"Updated strategy: {strategy.get('name')}",
-                    "strategies": [],
-                    "selected_strategy": strategy
-                }
+            # Update config if provided
+            if config_content:
+                try:
+                    if isinstance(config_content, _JSON_TYPES):
+                        strategy["config"] = _loads(config_content)
+                    else:
+                        strategy["config"] = config_content
+                except ValueError:
+                    return _error_response("Invalid JSON configuration content")
+            elif config_path and os.path.isfile(config_path):
+                try:
+                    strategy["config"] = _loads(_read_file(config_path)[1])
+                except Exception as e:
+                    return _error_response(f"Failed to load configuration: {str(e)}")
                 
-        # Not found
+            # Update tags if provided
+            if tags:
+                strategy["tags"] = tags
+            
+            # Update description if script was updated
+            if script_content or (script_path and os.path.isfile(script_path)):
+                strategy["description"] = _description(strategy["script"])
+            
+            # Update timestamp
+            strategy["updated_at"] = datetime.now().isoformat()
+            
+            # Save the library
+            self._save_library(self._write_payload(strategy))
+        
         return {
-            "status": "error",
-            "message": f"Strategy not found with ID: {strategy_id}",
+            "status": "success",
+            "message": f"Updated strategy: {strategy.get('name')}",
             "strategies": [],
-            "selected_strategy": {}
+            "selected_strategy": strategy
         }
         
     def _delete_strategy(self, strategy_id):
         """Delete a strategy from the library"""
         if not strategy_id:
-            return {
-                "status": "error",
-                "message": "Strategy ID is required for deletion",
-                "strategies": [],
-                "selected_strategy": {}
-            }
+            return _error_response("Strategy ID is required for deletion")
             
-        # Load the library
-        strategies = self._load_library()
-        original_count = len(strategies)
-        
-        # Filter out the strategy to delete
-        strategies = [s for s in strategies if s.get("id") != strategy_id]
-        
-        # If no strategies were removed, the ID wasn't found
-        if len(strategies) == original_count:
-            return {
-                "status": "error",
-                "message": f"Strategy not found with ID: {strategy_id}",
-                "strategies": [],
-                "selected_strategy": {}
-            }
+        with self._locked():
+            # Load the library
+            by_id = self._load_library()[1]
             
-        # Save the updated library
-        self._save_library(strategies)
+            if strategy_id not in by_id:
+                return _error_response(f"Strategy not found with ID: {strategy_id}")
+                
+            # Record the deletion, then drop the script and config it no longer needs
+            self._save_library({"id": strategy_id, "_deleted": True})
+            shutil.rmtree(self._payload_dir(strategy_id), ignore_errors=True)
         
         return {
             "status": "success",